@@ -1,5 +1,6 @@
 import os
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException
 from loguru import logger
@@ -7,7 +8,9 @@ from tqdm import tqdm
 from undl.client import UNDLClient
 
 from unml.graphdb.graphdb import GraphDB
-from unml.main import runPipelines
+from unml.main import loadModels, runPipelines
+from unml.modules.ner import NamedEntityRecognizer
+from unml.modules.summarize import Summarizer
 from unml.utils.consts.api import APIConsts
 from unml.utils.misc import log
 from unml.utils.network import NetworkUtils
@@ -20,10 +23,68 @@ graphDB = GraphDB()
 
 recordsCache: Dict[str, Optional[Document]] = {}
 
+# Models loaded once on startup and shared by all the requests
+models: Tuple[Optional[Summarizer], Optional[NamedEntityRecognizer]] = (None, None)
+isReady = False
+# Error raised while loading the models, if it failed
+loadingError: Optional[str] = None
+
+
+def warmUp() -> None:
+    """
+    Run the models once on `APIConsts.WARMUP_TEXT`.
+    """
+    summarizer, ner = models
+
+    if summarizer is not None:
+        # Bypass the summary memo, which would skip the model after the first start
+        summarizer.summarizer.summarize(text=APIConsts.WARMUP_TEXT)
+
+    if ner is not None:
+        ner.recognize(text=APIConsts.WARMUP_TEXT)
+
+
+def loadModelsInBackground() -> None:
+    """
+    Load and warm up the models, then report the API as ready. If they cannot be
+    loaded, the error is kept in `loadingError` and reported by the endpoints.
+    """
+    global models, isReady, loadingError
+
+    try:
+        models = loadModels(args=APIConsts.DEFAULT_PIPELINE_ARGS)
+        warmUp()
+    except Exception as e:
+        loadingError = repr(e)
+        log(f"Could not load the models: {e}", level="error", verbose=True)
+        return
+
+    isReady = True
+    log("Models loaded and warmed up, API is ready!", level="success", verbose=True)
+
+
+def checkReady() -> None:
+    """
+    Check that the models are loaded and warmed up.
+
+    Raises
+    ------
+    `HTTPException`
+        With status `500` if the models could not be loaded, and `503` while they
+        are loading
+    """
+    if loadingError is not None:
+        raise HTTPException(500, f"Models could not be loaded: {loadingError}")
+
+    if not isReady:
+        raise HTTPException(503, "Models are loading")
+
 
 def onStart() -> None:
     """
-    Function to run on startup.
+    Function to run on startup. The models are loaded in the background, so that
+    the API serves `/ready`, with a `503` status, until they are loaded and warmed
+    up, and with a `500` status if they could not be loaded.
     """
     log("Starting API...", level="info", verbose=True)
     graphDB.checkConnection()
@@ -31,6 +92,12 @@ def onStart() -> None:
     if os.getenv("UN_API") is None:
         raise ValueError("Environment variable UN_API is not set!")
 
+    threading.Thread(
+        target=loadModelsInBackground,
+        name="unml-models",
+        daemon=True,
+    ).start()
+
     log("API started!", level="success", verbose=True)
 
 
@@ -56,6 +123,27 @@ def readRoot() -> JSON:
     return {"Hello": "✅"}
 
 
+@app.get("/ready")  # type: ignore
+def ready() -> JSON:
+    """
+    Readiness endpoint, for the load balancer.
+
+    Returns
+    -------
+    `JSON`
+        A `{"ready": true}` object once the models are loaded and warmed up
+
+    Raises
+    ------
+    `HTTPException`
+        With status `500` if the models could not be loaded, and `503` while they
+        are loading
+    """
+    checkReady()
+
+    return {"ready": True}
+
+
 @app.post("/run")  # type: ignore
 def run(records: List[Record], n: int = 400) -> JSON | List[JSON]:
     """
@@ -76,9 +164,15 @@ def run(records: List[Record], n: int = 400) -> JSON | List[JSON]:
     -------
     `JSON | List[JSON]`
         The list of documents with the pipeline results
+
+    Raises
+    ------
+    `HTTPException`
+        With status `500` if the models could not be loaded, and `503` while they
+        are loading
     """
+    checkReady()
 
-    currentRecord = ""
     nonExistentRecords = [
         record
         for record in tqdm(records, desc="Checking if records exist...", unit="record")
@@ -88,42 +182,48 @@ def run(records: List[Record], n: int = 400) -> JSON | List[JSON]:
         f"{len(records) - len(nonExistentRecords):,} documents are already in the DB.",
         verbose=True,
     )
+    selectedRecords = nonExistentRecords[:n]
+
+    cachedRecords = [r for r in selectedRecords if r.recordId in recordsCache]
+    log(
+        f"{len(cachedRecords):,} records found in cache!",
+        verbose=True,
+        level="success",
+    )
+
     try:
-        parsedDocs = []
-
-        for record in nonExistentRecords[:n]:
-            currentRecord = record.recordId
-            if record.recordId in recordsCache:
-                log(
-                    f"Record {record.recordId} found in cache!",
-                    verbose=True,
-                    level="success",
-                )
-                parsedDocs.append(recordsCache[record.recordId])
-                continue
-
-            doc = NetworkUtils.queryByIdUNDL(record=record)
-            if doc is None:
-                log(
-                    f"Record {record.recordId} not found!",
-                    verbose=True,
-                    level="error",
-                )
-                continue
-            parsedDocs.append(doc)
-            recordsCache[record.recordId] = doc
+        recordsToQuery = [r for r in selectedRecords if r.recordId not in recordsCache]
+        queriedDocs = NetworkUtils.queryByIdsUNDL(
+            records=recordsToQuery,
+            client=clientUNDL,
+            verbose=True,
+        )
 
     except Exception as e:
-        log(f"Error: {e} at record {currentRecord}", level="error", verbose=True)
+        log(f"Error: {e}", level="error", verbose=True)
         raise HTTPException(500, f"Internal server error: {e}")
 
+    for record, doc in zip(recordsToQuery, queriedDocs):
+        if doc is not None:
+            recordsCache[record.recordId] = doc
+
+    parsedDocs = [
+        recordsCache[record.recordId]
+        for record in selectedRecords
+        if recordsCache.get(record.recordId) is not None
+    ]
+
     if len(parsedDocs) == 0:
         return {
             "info": "No new documents found",
         }
 
     log(f"Could parse {len(parsedDocs):,} documents", verbose=True)
-    return runPipelines(documents=parsedDocs, args=APIConsts.DEFAULT_PIPELINE_ARGS)
+    return runPipelines(
+        documents=parsedDocs,
+        args=APIConsts.DEFAULT_PIPELINE_ARGS,
+        models=models,
+    )
 
 
 @app.get("/run_search")  # type: ignore
@@ -149,7 +249,14 @@ def run_search(q: str, n: int = 400) -> JSON | List[JSON]:
     -------
     `List[JSON]`
         The list of documents with the pipeline results
+
+    Raises
+    ------
+    `HTTPException`
+        With status `500` if the models could not be loaded, and `503` while they
+        are loading
     """
+    checkReady()
 
     logger.info(f"Querying UNDL for prompt: {q}")
 
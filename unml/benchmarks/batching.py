@@ -0,0 +1,139 @@
+"""
+This module contains a benchmark of batched summarization. It compares the
+latency and the outputs of `Summarizer.summarizeBatch` on the whole sample corpus
+of `res/benchmark/corpus.json` against the unbatched path, i.e. `summarize` on each
+text with a batch size of `1`:
+
+```bash
+poetry run python -m unml.benchmarks.batching --summarizer led --check
+```
+
+With `--check`, the benchmark exits with a non-zero status if any batched summary
+differs from its unbatched counterpart.
+"""
+import json
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from unml.benchmarks.quantization import getUnigramF1, loadCorpus
+from unml.modules.summarize import Summarizer
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.misc import log
+
+
+def benchmarkBatching(
+    model: str,
+    texts: List[str],
+    batchSize: int = SummarizationConsts.BATCH_SIZE,
+) -> Tuple[Dict[str, float], List[int]]:
+    """
+    Compare batched summarization against the unbatched path.
+
+    Parameters
+    ----------
+    `model` : `str`
+        The summarization model, as in `SummarizationConsts.ARGS_MAP`
+    `texts` : `List[str]`
+        The texts to summarize
+    `batchSize` : `int`, optional
+        The batch size of the batched path, by default `BATCH_SIZE`
+
+    Returns
+    -------
+    `Tuple[Dict[str, float], List[int]]`
+        The latencies, the speed-up, the share of identical summaries and their
+        mean unigram F1 score against the unbatched ones, and the indices of the
+        texts whose summaries differ
+    """
+    # Disable the memo so that both paths run every chunk through the model
+    summarizer = Summarizer(model=model, batchSize=1, memoSize=0)
+    # Warm-up run, so that neither path pays the first call
+    summarizer.summarize(text=texts[0])
+
+    start = time.perf_counter()
+    reference = [summarizer.summarize(text=text) for text in texts]
+    latency = time.perf_counter() - start
+
+    summarizer.batchSize = batchSize
+    start = time.perf_counter()
+    batched = summarizer.summarizeBatch(texts=texts)
+    batchedLatency = time.perf_counter() - start
+
+    different = [i for i, (r, b) in enumerate(zip(reference, batched)) if r != b]
+
+    return {
+        "latency": latency,
+        "batchedLatency": batchedLatency,
+        "speedUp": latency / batchedLatency,
+        "identical": 1 - len(different) / len(texts),
+        "unigramF1": sum(
+            getUnigramF1(reference=r, candidate=b) for r, b in zip(reference, batched)
+        )
+        / len(texts),
+    }, different
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark batched summarization")
+    parser.add_argument(
+        "--summarizer",
+        type=str,
+        default=SummarizationConsts.DEFAULT_SUMMARIZATION_MODEL,
+        choices=SummarizationConsts.ARGS_MAP.keys(),
+        help="Summarization model to benchmark",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=SummarizationConsts.BATCH_SIZE,
+        help="Batch size of the batched path",
+    )
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=IOConsts.BENCHMARK_CORPUS_PATH,
+        help="Path of the sample corpus",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with a non-zero status if batched and unbatched summaries differ",
+    )
+    parser.add_argument("-o", "--output", type=str, help="Output JSON file path")
+    args = parser.parse_args()
+
+    texts = loadCorpus(path=args.corpus)
+    metrics, different = benchmarkBatching(
+        model=args.summarizer,
+        texts=texts,
+        batchSize=args.batch_size,
+    )
+
+    log(
+        f"summarizer {args.summarizer}: {metrics['latency']:.2f}s -> "
+        + f"{metrics['batchedLatency']:.2f}s for {len(texts):,} documents "
+        + f"(x{metrics['speedUp']:.2f}), identical {metrics['identical']:.3f}, "
+        + f"unigramF1 {metrics['unigramF1']:.3f}",
+        level="success" if not different else "warning",
+        verbose=True,
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"model": args.summarizer, **metrics, "different": different},
+                f,
+                indent=4,
+            )
+
+    if args.check and different:
+        log(
+            f"Batched summaries differ from the unbatched ones for documents {different}",
+            level="error",
+            verbose=True,
+        )
+        sys.exit(1)
@@ -0,0 +1,258 @@
+"""
+This module contains a benchmark of int8 dynamic quantization. It compares the
+latency and the outputs of the summarization and NER models, with and without
+quantization, on the fixed sample corpus of `res/benchmark/corpus.json`:
+
+```bash
+poetry run python -m unml.benchmarks.quantization --summarizer led --recognizer roberta
+```
+"""
+import json
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Set, Tuple, TypeVar
+
+from unml.modules.ner import NamedEntityRecognizer
+from unml.modules.summarize import Summarizer
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.ner import NERConsts
+from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.misc import log
+
+T = TypeVar("T")
+
+
+def loadCorpus(path: Path = IOConsts.BENCHMARK_CORPUS_PATH) -> List[str]:
+    """
+    Load the texts of the sample corpus.
+
+    Parameters
+    ----------
+    `path` : `Path`, optional
+        The path of the corpus, a JSON list of `{"id", "text"}` objects, by
+        default `BENCHMARK_CORPUS_PATH`
+
+    Returns
+    -------
+    `List[str]`
+        The texts of the corpus
+    """
+    with open(path, "r") as f:
+        return [str(document["text"]) for document in json.load(f)]
+
+
+def timeOutputs(
+    function: Callable[[str], T], texts: List[str]
+) -> Tuple[List[T], float]:
+    """
+    Run a function on each text, after a warm-up run on the first one.
+
+    Parameters
+    ----------
+    `function` : `Callable[[str], T]`
+        The function to run
+    `texts` : `List[str]`
+        The texts
+
+    Returns
+    -------
+    `Tuple[List[T], float]`
+        The outputs of the function, and its mean latency per text, in seconds
+    """
+    function(texts[0])
+
+    start = time.perf_counter()
+    outputs = [function(text) for text in texts]
+
+    return outputs, (time.perf_counter() - start) / len(texts)
+
+
+def getUnigramF1(reference: str, candidate: str) -> float:
+    """
+    Compute the unigram F1 score of a text against a reference, as ROUGE-1 does.
+
+    Parameters
+    ----------
+    `reference` : `str`
+        The reference text
+    `candidate` : `str`
+        The text to compare to the reference
+
+    Returns
+    -------
+    `float`
+        The F1 score, between `0` and `1`
+    """
+    referenceTokens = Counter(reference.lower().split())
+    candidateTokens = Counter(candidate.lower().split())
+    overlap = sum((referenceTokens & candidateTokens).values())
+
+    if overlap == 0:
+        return float(reference == candidate)
+
+    precision = overlap / sum(candidateTokens.values())
+    recall = overlap / sum(referenceTokens.values())
+
+    return 2 * precision * recall / (precision + recall)
+
+
+def getJaccard(reference: Set[Any], candidate: Set[Any]) -> float:
+    """
+    Compute the Jaccard index of two sets.
+
+    Parameters
+    ----------
+    `reference` : `Set[Any]`
+        The reference set
+    `candidate` : `Set[Any]`
+        The set to compare to the reference
+
+    Returns
+    -------
+    `float`
+        The Jaccard index, between `0` and `1`
+    """
+    if not reference and not candidate:
+        return 1.0
+
+    return len(reference & candidate) / len(reference | candidate)
+
+
+def benchmarkSummarizer(model: str, texts: List[str]) -> Dict[str, float]:
+    """
+    Compare the summarizer with and without quantization.
+
+    Parameters
+    ----------
+    `model` : `str`
+        The summarization model, as in `SummarizationConsts.ARGS_MAP`
+    `texts` : `List[str]`
+        The texts to summarize
+
+    Returns
+    -------
+    `Dict[str, float]`
+        The mean latencies, the speed-up, and the mean unigram F1 score of the
+        quantized summaries against the full precision ones
+    """
+    results: Dict[bool, Tuple[List[str], float]] = {}
+
+    for quantize in (False, True):
+        # Disable the memo so that every chunk goes through the model
+        summarizer = Summarizer(model=model, memoSize=0, quantize=quantize)
+        results[quantize] = timeOutputs(function=summarizer.summarize, texts=texts)
+        del summarizer
+
+    (reference, latency), (quantized, quantizedLatency) = results[False], results[True]
+
+    return {
+        "latency": latency,
+        "quantizedLatency": quantizedLatency,
+        "speedUp": latency / quantizedLatency,
+        "unigramF1": sum(
+            getUnigramF1(reference=r, candidate=q) for r, q in zip(reference, quantized)
+        )
+        / len(texts),
+        "identical": sum(r == q for r, q in zip(reference, quantized)) / len(texts),
+    }
+
+
+def benchmarkRecognizer(model: str, texts: List[str]) -> Dict[str, float]:
+    """
+    Compare the named entity recognizer with and without quantization.
+
+    Parameters
+    ----------
+    `model` : `str`
+        The NER model, as in `NERConsts.ARGS_MAP`
+    `texts` : `List[str]`
+        The texts to recognize entities in
+
+    Returns
+    -------
+    `Dict[str, float]`
+        The mean latencies, the speed-up, and the mean Jaccard index of the
+        quantized entities against the full precision ones
+    """
+    results: Dict[bool, Tuple[List[Set[Tuple[str, str]]], float]] = {}
+
+    for quantize in (False, True):
+        recognizer = NamedEntityRecognizer(model=model, quantize=quantize)
+        results[quantize] = timeOutputs(
+            function=lambda text: {
+                (entity["entity_group"], entity["word"])
+                for entity in recognizer.recognize(text=text)[3]
+            },
+            texts=texts,
+        )
+        del recognizer
+
+    (reference, latency), (quantized, quantizedLatency) = results[False], results[True]
+
+    return {
+        "latency": latency,
+        "quantizedLatency": quantizedLatency,
+        "speedUp": latency / quantizedLatency,
+        "jaccard": sum(
+            getJaccard(reference=r, candidate=q) for r, q in zip(reference, quantized)
+        )
+        / len(texts),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark int8 dynamic quantization")
+    parser.add_argument(
+        "--summarizer",
+        type=str,
+        default=SummarizationConsts.DEFAULT_SUMMARIZATION_MODEL,
+        choices=SummarizationConsts.ARGS_MAP.keys(),
+        help="Summarization model to benchmark",
+    )
+    parser.add_argument(
+        "--recognizer",
+        type=str,
+        default="roberta",
+        choices=NERConsts.ARGS_MAP.keys(),
+        help="NER model to benchmark (only RoBERTa supports quantization)",
+    )
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=IOConsts.BENCHMARK_CORPUS_PATH,
+        help="Path of the sample corpus",
+    )
+    parser.add_argument("-o", "--output", type=str, help="Output JSON file path")
+    args = parser.parse_args()
+
+    texts = loadCorpus(path=args.corpus)
+    report = {
+        "summarizer": {
+            "model": args.summarizer,
+            **benchmarkSummarizer(model=args.summarizer, texts=texts),
+        },
+        "recognizer": {
+            "model": args.recognizer,
+            **benchmarkRecognizer(model=args.recognizer, texts=texts),
+        },
+    }
+
+    for task, metrics in report.items():
+        log(
+            f"{task} {metrics['model']}: {metrics['latency']:.2f}s -> "
+            + f"{metrics['quantizedLatency']:.2f}s per document "
+            + f"(x{metrics['speedUp']:.2f}), "
+            + ", ".join(
+                f"{key} {value:.3f}"
+                for key, value in metrics.items()
+                if key not in {"model", "latency", "quantizedLatency", "speedUp"}
+            ),
+            level="success",
+            verbose=True,
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
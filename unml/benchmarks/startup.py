@@ -0,0 +1,178 @@
+"""
+This module contains a benchmark of the startup time of the pipeline. It compares,
+in fresh interpreters, the import of the CLI entry point alone, with the selected
+models imported lazily, and with all the models imported eagerly as before the
+model registry:
+
+```bash
+poetry run python -m unml.benchmarks.startup --summarizer led --recognizer spacy
+```
+"""
+import json
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+from typing import Any, Dict, List
+
+from unml.utils.consts.ner import NERConsts
+from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.misc import log
+
+# Heavy frameworks whose import is reported
+FRAMEWORKS = ("torch", "transformers", "flair", "spacy")
+
+ENTRY_POINT = "import unml.main"
+
+
+def timeImport(statements: str, repeats: int = 5) -> Dict[str, Any]:
+    """
+    Time the execution of import statements in fresh interpreters.
+
+    Parameters
+    ----------
+    `statements` : `str`
+        The Python statements to time
+    `repeats` : `int`, optional
+        Number of interpreters to run them in, by default `5`
+
+    Returns
+    -------
+    `Dict[str, Any]`
+        The median time of the statements, in seconds, and the heavy frameworks
+        they imported
+    """
+    code = "\n".join(
+        [
+            "import json, sys, time",
+            "start = time.perf_counter()",
+            statements,
+            "duration = time.perf_counter() - start",
+            f"frameworks = [f for f in {FRAMEWORKS!r} if f in sys.modules]",
+            "print(json.dumps({'duration': duration, 'frameworks': frameworks}))",
+        ]
+    )
+
+    runs: List[Dict[str, Any]] = []
+    for _ in range(repeats):
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        runs.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    return {
+        "duration": statistics.median(run["duration"] for run in runs),
+        "frameworks": runs[-1]["frameworks"],
+    }
+
+
+def benchmarkStartup(
+    summarizer: str,
+    recognizer: str,
+    repeats: int = 5,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare the startup time of the pipeline with lazy and eager model imports.
+
+    Parameters
+    ----------
+    `summarizer` : `str`
+        The summarization model, as in `SummarizationConsts.ARGS_MAP`
+    `recognizer` : `str`
+        The NER model, as in `NERConsts.ARGS_MAP`
+    `repeats` : `int`, optional
+        Number of interpreters to time each scenario in, by default `5`
+
+    Returns
+    -------
+    `Dict[str, Dict[str, Any]]`
+        The median time and the imported frameworks of the entry point alone,
+        of the entry point and the selected models, and of the entry point and
+        all the models
+    """
+    selected = [
+        SummarizationConsts.ARGS_MAP[summarizer],
+        NERConsts.ARGS_MAP[recognizer],
+    ]
+
+    return {
+        "entryPoint": timeImport(statements=ENTRY_POINT, repeats=repeats),
+        "lazy": timeImport(
+            statements="\n".join(
+                [
+                    ENTRY_POINT,
+                    "from unml.models.registry import getModelClass",
+                    *(f"getModelClass({name!r})" for name in selected),
+                ]
+            ),
+            repeats=repeats,
+        ),
+        "eager": timeImport(
+            statements="\n".join(
+                [
+                    ENTRY_POINT,
+                    "import importlib",
+                    "from unml.models.registry import MODEL_MODULES",
+                    "for module in MODEL_MODULES.values():",
+                    "    importlib.import_module(module)",
+                ]
+            ),
+            repeats=repeats,
+        ),
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark the startup time of the pipeline")
+    parser.add_argument(
+        "--summarizer",
+        type=str,
+        default=SummarizationConsts.DEFAULT_SUMMARIZATION_MODEL,
+        choices=SummarizationConsts.ARGS_MAP.keys(),
+        help="Summarization model to import",
+    )
+    parser.add_argument(
+        "--recognizer",
+        type=str,
+        default=NERConsts.DEFAULT_NER_MODEL,
+        choices=NERConsts.ARGS_MAP.keys(),
+        help="NER model to import",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=5,
+        help="Number of interpreters to time each scenario in",
+    )
+    parser.add_argument("-o", "--output", type=str, help="Output JSON file path")
+    args = parser.parse_args()
+
+    report = benchmarkStartup(
+        summarizer=args.summarizer,
+        recognizer=args.recognizer,
+        repeats=args.repeats,
+    )
+
+    for scenario, metrics in report.items():
+        log(
+            f"{scenario}: {metrics['duration']:.2f}s, frameworks imported: "
+            + (", ".join(metrics["frameworks"]) or "none"),
+            level="info",
+            verbose=True,
+        )
+
+    log(
+        f"Lazy imports save {report['eager']['duration'] - report['lazy']['duration']:.2f}s"
+        + " at startup with the selected models, and"
+        + f" {report['eager']['duration'] - report['entryPoint']['duration']:.2f}s"
+        + " until a model is loaded",
+        level="success",
+        verbose=True,
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
@@ -1,5 +1,7 @@
+import queue
 import sys
-from typing import Any, Dict, List, Optional
+import threading
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple
 
 from tqdm import tqdm
 
@@ -8,27 +10,236 @@ from unml.modules.ner import NamedEntityRecognizer
 from unml.modules.summarize import Summarizer
 from unml.utils.api import APIUtils
 from unml.utils.args import ArgUtils
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.model import ModelConsts
+from unml.utils.consts.ner import NERConsts
+from unml.utils.consts.network import NetworkConsts
+from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.consts.text import TextConsts
 from unml.utils.io import IOUtils
-from unml.utils.misc import log
+from unml.utils.misc import batched, log
 from unml.utils.network import NetworkUtils
+from unml.utils.stages import StageExecutor, setTorchThreads
 from unml.utils.types.document import Document
 from unml.utils.types.json import JSON
+from unml.utils.types.recognition import BatchRecognitions, Recognition
+
+
+def getDownloadOptions(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the options of the download and extraction stage from the pipeline
+    arguments, falling back to the defaults for the missing ones.
+
+    Parameters
+    ----------
+    `args` : `Dict[str, Any]`
+        The pipeline arguments
+
+    Returns
+    -------
+    `Dict[str, Any]`
+        The keyword arguments to pass to `NetworkUtils`
+    """
+    return {
+        "maxConcurrency": args.get(
+            "max_downloads",
+            NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+        ),
+        "maxConcurrencyPerHost": args.get(
+            "max_downloads_per_host",
+            NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+        ),
+        "extractionWorkers": args.get(
+            "extraction_workers",
+            TextConsts.EXTRACTION_WORKERS,
+        ),
+        "saveToDisk": args.get("save_downloads", IOConsts.SAVE_DOWNLOADS),
+        "cacheSize": args.get(
+            "download_cache_size",
+            IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+        ),
+        "pageRangeThreshold": args.get(
+            "page_range_threshold",
+            TextConsts.PAGE_RANGE_THRESHOLD,
+        ),
+        "useTextStore": args.get("text_store", IOConsts.USE_TEXT_STORE),
+    }
+
+
+def loadModels(
+    args: Dict[str, Any],
+) -> Tuple[Optional[Summarizer], Optional[NamedEntityRecognizer]]:
+    """
+    Instantiate the summarizer and the named entity recognizer of the enabled
+    tasks.
+
+    Parameters
+    ----------
+    `args` : `Dict[str, Any]`
+        The pipeline arguments
+
+    Returns
+    -------
+    `Tuple[Optional[Summarizer], Optional[NamedEntityRecognizer]]`
+        The summarizer if summarization is enabled, and the named entity
+        recognizer if NER is enabled
+    """
+    summarizer = (
+        Summarizer(
+            model=args["summarizer"],
+            batchSize=args.get("summary_batch_size", SummarizationConsts.BATCH_SIZE),
+            memoSize=args.get("summary_memo_size", IOConsts.SUMMARY_MEMO_MAX_SIZE_MB),
+            fanOut=args.get("fan_out", SummarizationConsts.FAN_OUT),
+            workers=args.get("reduce_workers", SummarizationConsts.REDUCE_WORKERS),
+            levelAware=args.get(
+                "level_aware_decoding", SummarizationConsts.LEVEL_AWARE_DECODING
+            ),
+            extractiveBudget=args.get(
+                "extractive_budget", SummarizationConsts.EXTRACTIVE_BUDGET
+            ),
+            backend=args.get("backend", ModelConsts.DEFAULT_BACKEND),
+            quantize=args.get("quantize", ModelConsts.QUANTIZE),
+        )
+        if args["summarize"]
+        else None
+    )
+    ner = (
+        NamedEntityRecognizer(
+            model=args["recognizer"],
+            backend=args.get("backend", ModelConsts.DEFAULT_BACKEND),
+            quantize=args.get("quantize", ModelConsts.QUANTIZE),
+            batchSize=args.get("ner_batch_size", NERConsts.BATCH_SIZE),
+            nProcess=args.get("ner_processes", NERConsts.SPACY_N_PROCESS),
+            dictionaryPath=args.get(
+                "entity_dictionary", IOConsts.ENTITY_DICTIONARY_PATH
+            ),
+        )
+        if args["ner"]
+        else None
+    )
+
+    return summarizer, ner
+
+
+def processDocument(
+    doc: Document,
+    textJson: Dict[str, Any],
+    args: Dict[str, Any],
+    summary: Optional[str] = None,
+    recognized: Optional[Recognition] = None,
+) -> Optional[JSON]:
+    """
+    Run the summarization and NER subpipelines on the extracted text of a document.
+    The document is updated in place with the results.
+
+    Parameters
+    ----------
+    `doc` : `Document`
+        The document
+    `textJson` : `Dict[str, Any]`
+        The `{"url": "...", "text": "..."}` object of the document
+    `args` : `Dict[str, Any]`
+        The pipeline arguments
+    `summary` : `Optional[str]`, optional
+        The summary of the document, computed beforehand with the other
+        documents of its batch, if summarization is enabled, by default `None`
+    `recognized` : `Optional[Recognition]`, optional
+        The named entities of the document, as returned by
+        `NamedEntityRecognizer.recognize`, computed beforehand with the other
+        documents of its batch, if NER is enabled, by default `None`
+
+    Returns
+    -------
+    `Optional[JSON]`
+        The result JSON of the document, `None` if its extracted text is empty
+    """
+    verbose = args["verbose"]
+
+    print("=" * 100 + "\n", file=sys.stderr)
+    log(f"Started working on {textJson['url']}", verbose=verbose, level="warning")
+    extractedText = textJson["text"]
+
+    if not extractedText:
+        log(
+            f"Extracted text for {textJson['url']} is empty! Still saving document in GraphDB",
+            level="error",
+            verbose=verbose,
+        )
+        return None
+
+    # Initialize result JSON
+    result: JSON = {
+        "url": textJson["url"],
+        "summary": None,
+        "named_entities": {
+            "list": None,
+            "detailed": None,
+        },
+    }
+
+    log(f"Document size: {len(extractedText):,} characters", verbose=verbose)
+
+    """
+    2. Summarize text, already done for the whole batch of documents
+    """
+    if summary is not None:
+        log(f"Summary: {summary}", verbose=verbose)
+        result["summary"] = summary
+        doc.summary = summary
+
+    """
+    3. Named Entity Recognition, already done for the whole batch of documents
+    """
+    if recognized is not None:
+        entities, countries, unBodies, detailed = recognized
+
+        doc.countries = countries
+        for body in unBodies:
+            if doc.unBodies is None:
+                doc.unBodies = []
+
+            if body not in doc.unBodies:
+                doc.unBodies.append(body)
+
+        result["named_entities"]["list"] = entities
+        result["named_entities"]["countries"] = countries
+        result["named_entities"]["detailed"] = detailed
+        result["named_entities"]["unBodies"] = unBodies
+
+    return result
 
 
 def runPipelines(
     documents: List[Optional[Document]],
     args: Dict[str, Any],
+    models: Optional[
+        Tuple[Optional[Summarizer], Optional[NamedEntityRecognizer]]
+    ] = None,
 ) -> List[JSON]:
     """
     Main function to run subpipelines: get text from a batch of URLs, then summarize
     text, extract Named Entities...
 
+    Documents are processed in batches of up to `args["document_batch_size"]`,
+    whose chunks are summarized in shared inference batches. The summarization
+    and NER of a batch run concurrently, see `StageExecutor`.
+
+    If `args["stream"]` is set, the stages run as a producer/consumer pipeline:
+    documents are downloaded and parsed in the background while the models run,
+    and written to the GraphDB by a dedicated thread, with bounded queues of
+    depth `args["prefetch"]` between the stages. A batch then only holds the
+    documents already extracted, and is never held back until it is full.
+
     Parameters
     ----------
     `docs` : `List[Document]`
         List of `Document` objects to run the pipeline on
-    `verbose` : `bool`, optional
-        Controls the verbose of the output, by default False
+    `args` : `Dict[str, Any]`
+        The pipeline arguments, as parsed by `ArgUtils.parseArgs`
+    `models` : `Optional[Tuple[Optional[Summarizer], Optional[NamedEntityRecognizer]]]`, optional
+        The summarizer and named entity recognizer to use, as returned by
+        `loadModels`, e.g. kept loaded by the API across requests. By default
+        `None`, to load them from `args`
 
     Returns
     -------
@@ -38,89 +249,172 @@ def runPipelines(
 
     docs = [doc for doc in documents if doc is not None]
     verbose = args["verbose"]
+    stream = args.get("stream", False)
+    prefetch = args.get("prefetch", NetworkConsts.PREFETCH_DEPTH)
     """
     0. Instantiate summarizer and NER depending on tasks as well as GraphDB connector
     """
     graphDB = GraphDB()
     graphDB.checkConnection()
 
-    if args["summarize"]:
-        summarizer = Summarizer(model=args["summarizer"])
-    if args["ner"]:
-        ner = NamedEntityRecognizer(model=args["recognizer"])
+    summarizer, ner = models if models is not None else loadModels(args=args)
 
     """
     1. Get text from files corresponding to URLs
     """
+    documentBatchSize = args.get(
+        "document_batch_size",
+        SummarizationConsts.DOCUMENT_BATCH_SIZE,
+    )
 
-    texts = NetworkUtils.extractTextFromDocuments(docs=docs, verbose=verbose)
-    results: List[JSON] = []
+    batches: Iterable[List[Tuple[Document, Dict[str, Any]]]]
+    downloads: Optional[
+        Generator[List[Tuple[Document, Dict[str, Any]]], None, None]
+    ] = None
+    if stream:
+        # Batches only hold the documents already extracted, so that the models
+        # never wait for a batch to be full
+        batches = downloads = NetworkUtils.streamTextFromDocuments(
+            docs=docs,
+            prefetch=prefetch,
+            maxBatchSize=documentBatchSize,
+            verbose=verbose,
+            **getDownloadOptions(args=args),
+        )
+    else:
+        extracted = iter(
+            NetworkUtils.extractTextFromDocuments(
+                docs=docs,
+                verbose=verbose,
+                **getDownloadOptions(args=args),
+            )
+        )
+        # Documents without URL are not downloaded, but still saved in the GraphDB
+        batches = batched(
+            [
+                (doc, next(extracted) if doc.url else {"url": None, "text": None})
+                for doc in docs
+            ],
+            size=documentBatchSize,
+        )
 
-    for textJson, doc in tqdm(zip(texts, docs)) if not verbose else zip(texts, docs):
-        print("=" * 100 + "\n", file=sys.stderr)
-        log(f"Started working on {textJson['url']}", verbose=verbose, level="warning")
-        extractedText = textJson["text"]
+    """
+    5. Save results to GraphDB, from a dedicated thread in streaming mode
+    """
+    writeQueue: queue.Queue[Optional[Document]] = queue.Queue(maxsize=prefetch)
 
-        # Initialize result JSON
-        result: JSON = {
-            "url": textJson["url"],
-            "summary": None,
-            "named_entities": {
-                "list": None,
-                "detailed": None,
-            },
-        }
+    def writeDocuments() -> None:
+        """
+        Write the documents of `writeQueue` to the GraphDB until `None` is received.
+        """
+        while (doc := writeQueue.get()) is not None:
+            try:
+                graphDB.createDocument(doc=doc, verbose=verbose)
+            except Exception as e:
+                log(
+                    f"Could not save document {doc.recordId} in GraphDB: {e}",
+                    level="error",
+                    verbose=True,
+                )
+
+    writer = threading.Thread(target=writeDocuments, name="unml-graphdb")
+    if stream:
+        writer.start()
 
-        if extractedText:
-            log(f"Document size: {len(extractedText):,} characters", verbose=verbose)
+    results: List[JSON] = []
+
+    # Summarization and NER only share the extracted texts: they run
+    # concurrently, with the number of torch threads of the process split
+    # between them
+    enabledStages = [
+        stage
+        for stage, model in (("summarize", summarizer), ("ner", ner))
+        if model is not None
+    ]
+    setTorchThreads(
+        nThreads=StageExecutor.getTorchThreads(
+            stages=enabledStages,
+            nThreads=args.get("torch_threads", ModelConsts.TORCH_THREADS),
+        )
+    )
+    stages = StageExecutor(stages=enabledStages, verbose=verbose)
+
+    progress = tqdm(total=len(docs), disable=verbose)
+    try:
+        for batch in batches:
+            progress.update(len(batch))
+            toProcess = [i for i, (_, t) in enumerate(batch) if t["text"]]
+            batchTexts = [batch[i][1]["text"] for i in toProcess]
 
             """
-            2. Summarize text
+            2. Summarize the texts of the batch together
             """
-            if args["summarize"]:
-                result["summary"] = summarizer.summarize(
-                    text=extractedText, verbose=verbose
+            summariesFuture = (
+                stages.submit(
+                    "summarize",
+                    summarizer.summarizeBatch,
+                    texts=batchTexts,
+                    verbose=verbose,
                 )
-                doc.summary = result["summary"]
+                if summarizer is not None
+                else None
+            )
 
             """
-            3. Named Entity Recognition
+            3. Recognize the named entities of the texts of the batch together,
+            while they are summarized
             """
-            if args["ner"]:
-                entities, countries, unBodies, detailed = ner.recognize(
-                    text=extractedText,
+            recognitionsFuture = (
+                stages.submit(
+                    "ner",
+                    ner.recognizeBatch,
+                    texts=batchTexts,
                     verbose=verbose,
                 )
+                if ner is not None
+                else None
+            )
 
-                doc.countries = countries
-                for body in unBodies:
-                    if doc.unBodies is None:
-                        doc.unBodies = []
-
-                    if body not in doc.unBodies:
-                        doc.unBodies.append(body)
+            summaries: List[Optional[str]] = [None] * len(batch)
+            if summariesFuture is not None:
+                for i, summary in zip(toProcess, summariesFuture.result()):
+                    summaries[i] = summary
 
-                result["named_entities"]["list"] = entities
-                result["named_entities"]["countries"] = countries
-                result["named_entities"]["detailed"] = detailed
-                result["named_entities"]["unBodies"] = unBodies
+            recognitions: BatchRecognitions = [None] * len(batch)
+            if recognitionsFuture is not None:
+                for i, recognized in zip(toProcess, recognitionsFuture.result()):
+                    recognitions[i] = recognized
 
-            """
-            4. Save results to result array
-            """
-            results.append(result)
+            for (doc, textJson), summary, recognized in zip(
+                batch, summaries, recognitions
+            ):
+                result = processDocument(
+                    doc=doc,
+                    textJson=textJson,
+                    args=args,
+                    summary=summary,
+                    recognized=recognized,
+                )
 
-        else:
-            log(
-                f"Extracted text for {textJson['url']} is empty! Still saving document in GraphDB",
-                level="error",
-                verbose=verbose,
-            )
+                """
+                4. Save results to result array
+                """
+                if result is not None:
+                    results.append(result)
 
-        """
-        5. Save results to GraphDB
-        """
-        graphDB.createDocument(doc=doc, verbose=verbose)
+                if stream:
+                    writeQueue.put(doc)
+                else:
+                    graphDB.createDocument(doc=doc, verbose=verbose)
+    finally:
+        progress.close()
+        stages.shutdown()
+        # Stop the downloads still in flight if a stage failed
+        if downloads is not None:
+            downloads.close()
+        if stream:
+            writeQueue.put(None)
+            writer.join()
 
     # Save results to a JSON file
     if args.get("output"):
@@ -1,8 +1,13 @@
-from typing import Any
-
-from transformers import Pipeline, pipeline
+import os
+from typing import TYPE_CHECKING, Any
 
+from unml.utils.consts.io import IOConsts
 from unml.utils.consts.model import ModelConsts
+from unml.utils.misc import log
+
+# `transformers` is only imported once a model is loaded, see `unml.models.registry`
+if TYPE_CHECKING:
+    from transformers import Pipeline
 
 
 class Model:
@@ -12,12 +17,15 @@ class Model:
 
     modelName: str
     task: str
-    model: Pipeline
+    backend: str
+    model: "Pipeline"
 
     def __init__(
         self,
         modelName: str,
         task: str,
+        backend: str = ModelConsts.DEFAULT_BACKEND,
+        quantize: bool = ModelConsts.QUANTIZE,
         **kwargs: Any,
     ) -> None:
         self.modelName = modelName
@@ -25,6 +33,191 @@ class Model:
         assert (
             task in ModelConsts.ML_TASKS
         ), f"Invalid task: {task}. Must be one of {ModelConsts.ML_TASKS}"
+        assert (
+            backend in ModelConsts.BACKENDS
+        ), f"Invalid backend: {backend}. Must be one of {ModelConsts.BACKENDS}"
 
         self.task = task
-        self.model = pipeline(task, model=modelName, **kwargs)
+        self.backend = backend
+        self.quantize = quantize
+
+        from transformers import pipeline
+
+        match backend:
+            case "onnx":
+                if quantize:
+                    log(
+                        "Quantization is only supported by the torch backend: ignored",
+                        level="warning",
+                        verbose=True,
+                    )
+                    self.quantize = False
+                self.model = self.loadONNXPipeline(**kwargs)
+            case _ if quantize:
+                self.model = self.loadQuantizedPipeline(**kwargs)
+            case _:
+                self.model = pipeline(task, model=modelName, **kwargs)
+
+    def loadQuantizedPipeline(self, **kwargs: Any) -> "Pipeline":
+        """
+        Load the model as a pipeline with its `Linear` layers quantized to int8
+        with dynamic quantization, for CPU inference. The quantized model is
+        cached on disk under `QUANTIZED_MODELS_FOLDER`, so that only the first
+        load pays the quantization cost.
+
+        Parameters
+        ----------
+        `**kwargs` : `Any`
+            Additional arguments of the pipeline
+
+        Returns
+        -------
+        `Pipeline`
+            The pipeline, running the quantized model on CPU
+        """
+        import torch
+        import transformers
+        from transformers import (
+            AutoConfig,
+            AutoModelForSeq2SeqLM,
+            AutoModelForTokenClassification,
+            AutoTokenizer,
+            GenerationConfig,
+            pipeline,
+        )
+
+        # Only the weights are cached, and loaded with `weights_only=True`: the
+        # packed int8 layout is only valid for the versions of `torch` and
+        # `transformers` that wrote it
+        cachePath = IOConsts.QUANTIZED_MODELS_FOLDER / (
+            f"{self.modelName.replace('/', '--')}"
+            + f"--torch-{torch.__version__}--transformers-{transformers.__version__}"
+            + ".state_dict.pt"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(self.modelName)
+
+        if cachePath.exists():
+            log(
+                f"Loading quantized {self.modelName} from {cachePath}",
+                level="info",
+                verbose=True,
+            )
+            # Rebuild the architecture without its full precision weights, then
+            # quantize it so that its modules match the cached weights
+            modelClass = {
+                "summarization": AutoModelForSeq2SeqLM,
+                "ner": AutoModelForTokenClassification,
+            }[self.task]
+            architecture = modelClass.from_config(
+                AutoConfig.from_pretrained(self.modelName)
+            )
+            if architecture.can_generate():
+                try:
+                    architecture.generation_config = GenerationConfig.from_pretrained(
+                        self.modelName
+                    )
+                except OSError:
+                    # The model has no generation config: the one derived from
+                    # its config is used
+                    pass
+
+            quantizedModel = torch.quantization.quantize_dynamic(
+                architecture,
+                {torch.nn.Linear},
+                dtype=torch.qint8,
+            )
+            quantizedModel.load_state_dict(
+                torch.load(cachePath, map_location="cpu", weights_only=True)
+            )
+        else:
+            log(
+                f"Quantizing {self.modelName} to int8. This is only done once",
+                level="info",
+                verbose=True,
+            )
+            fullModel = pipeline(self.task, model=self.modelName, device="cpu").model
+            quantizedModel = torch.quantization.quantize_dynamic(
+                fullModel,
+                {torch.nn.Linear},
+                dtype=torch.qint8,
+            )
+
+            os.makedirs(cachePath.parent, exist_ok=True)
+            # Write to a temporary file first so that concurrent loads never
+            # read a partially written model
+            tmpPath = cachePath.with_suffix(f".{os.getpid()}.tmp")
+            torch.save(quantizedModel.state_dict(), tmpPath)
+            os.replace(tmpPath, cachePath)
+
+        quantizedModel.eval()
+
+        return pipeline(
+            self.task,
+            model=quantizedModel,
+            tokenizer=tokenizer,
+            device="cpu",
+            **kwargs,
+        )
+
+    def loadONNXPipeline(self, **kwargs: Any) -> "Pipeline":
+        """
+        Load the model as an ONNX Runtime pipeline. The model is exported to ONNX
+        on the first load, and the exported graphs are cached on disk under
+        `ONNX_MODELS_FOLDER` for the next ones.
+
+        Parameters
+        ----------
+        `**kwargs` : `Any`
+            Additional arguments of the pipeline
+
+        Returns
+        -------
+        `Pipeline`
+            The pipeline, running the model with ONNX Runtime on CPU
+        """
+        try:
+            from optimum.onnxruntime import (
+                ORTModelForSeq2SeqLM,
+                ORTModelForTokenClassification,
+            )
+            from optimum.pipelines import pipeline as ortPipeline
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX backend requires `optimum[onnxruntime]`:"
+                + " install it with `poetry install --extras onnx`"
+            ) from e
+
+        ortClass = {
+            "summarization": ORTModelForSeq2SeqLM,
+            "ner": ORTModelForTokenClassification,
+        }[self.task]
+
+        exportFolder = IOConsts.ONNX_MODELS_FOLDER / self.modelName.replace("/", "--")
+
+        if any(exportFolder.glob("*.onnx")):
+            log(
+                f"Loading ONNX export of {self.modelName} from {exportFolder}",
+                level="info",
+                verbose=True,
+            )
+            ortModel = ortClass.from_pretrained(exportFolder)
+            tokenizer = AutoTokenizer.from_pretrained(exportFolder)
+        else:
+            log(
+                f"Exporting {self.modelName} to ONNX in {exportFolder}. This is only done once",
+                level="info",
+                verbose=True,
+            )
+            ortModel = ortClass.from_pretrained(self.modelName, export=True)
+            tokenizer = AutoTokenizer.from_pretrained(self.modelName)
+            ortModel.save_pretrained(exportFolder)
+            tokenizer.save_pretrained(exportFolder)
+
+        return ortPipeline(
+            self.task,
+            model=ortModel,
+            tokenizer=tokenizer,
+            accelerator="ort",
+            **kwargs,
+        )
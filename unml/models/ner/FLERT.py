@@ -1,9 +1,12 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 from flair.data import Sentence
 from flair.models import SequenceTagger
+from segtok.segmenter import split_single
 
 from unml.models.model import Model
+from unml.utils.consts.ner import NERConsts
+from unml.utils.text import TextUtils
 
 
 class FLERT(Model):
@@ -15,28 +18,102 @@ class FLERT(Model):
     MODEL_NAME_SMALL = "flair/ner-english-fast"
     MODEL_NAME_LARGE = "flair/ner-english-large"
 
-    def __init__(self, modelName: str = MODEL_NAME_SMALL) -> None:
+    def __init__(
+        self,
+        modelName: str = MODEL_NAME_SMALL,
+        batchSize: int = NERConsts.BATCH_SIZE,
+    ) -> None:
         self.model = SequenceTagger.load(modelName)
         self.MODEL_NAME = modelName
+        self.batchSize = batchSize
 
     def recognize(self, text: str) -> List[Dict[str, Any]]:
         """
         See doc for `NamedEntityRecognizer` class
         """
-        entities = []
-        sentence = Sentence(text)
-
-        self.model.predict(sentence)
-
-        for entity in sentence.get_spans("ner"):
-            entities.append(
-                {
-                    "entity_group": entity.tag,
-                    "score": entity.score,
-                    "word": entity.text,
-                    "start": entity.start_position,
-                    "end": entity.end_position,
-                }
+        return self.recognizeBatch(texts=[text])[0]
+
+    def recognizeBatch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Recognize named entities in several texts, split into sentences which
+        are predicted in mini-batches of `batchSize` sentences of similar
+        lengths, so that memory is bounded by the longest sentence instead of
+        the longest text.
+
+        Parameters
+        ----------
+        `texts` : `List[str]`
+            The texts
+
+        Returns
+        -------
+        `List[List[Dict[str, Any]]]`
+            The named entities of each text, with their `start`/`end` offsets in
+            the text
+        """
+        sentences: List[Sentence] = []
+        origins: List[Tuple[int, int]] = []
+
+        for i, text in enumerate(texts):
+            for start, end in self.splitSentences(text=text):
+                sentences.append(Sentence(text[start:end]))
+                origins.append((i, start))
+
+        # Sentences of similar lengths are padded together
+        order = sorted(range(len(sentences)), key=lambda j: len(sentences[j]))
+        if sentences:
+            self.model.predict(
+                [sentences[j] for j in order],
+                mini_batch_size=self.batchSize,
             )
 
+        entities: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        for sentence, (i, offset) in zip(sentences, origins):
+            for entity in sentence.get_spans("ner"):
+                entities[i].append(
+                    {
+                        "entity_group": entity.tag,
+                        "score": entity.score,
+                        "word": entity.text,
+                        "start": offset + entity.start_position,
+                        "end": offset + entity.end_position,
+                    }
+                )
+
         return entities
+
+    @staticmethod
+    def splitSentences(text: str) -> List[Tuple[int, int]]:
+        """
+        Split a text into sentences with `segtok`. Sentences longer than
+        `FLERT_MAX_SENTENCE_LENGTH` characters, e.g. tables without punctuation,
+        are split further.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to split
+
+        Returns
+        -------
+        `List[Tuple[int, int]]`
+            The `(start, end)` character span of each sentence in the text
+        """
+        spans: List[Tuple[int, int]] = []
+        position = 0
+
+        for sentence in split_single(text):
+            start = text.find(sentence, position)
+            if not sentence.strip() or start < 0:
+                continue
+
+            position = start + len(sentence)
+            spans.extend(
+                (start + pieceStart, start + pieceEnd)
+                for pieceStart, pieceEnd in TextUtils.splitText(
+                    text=sentence,
+                    maxLength=NERConsts.FLERT_MAX_SENTENCE_LENGTH,
+                )
+            )
+
+        return spans
@@ -0,0 +1,144 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from unml.models.model import Model
+from unml.utils.consts.io import IOConsts
+from unml.utils.gazetteer import Gazetteer
+from unml.utils.misc import log
+from unml.utils.text import TextUtils
+
+
+class GazetteerNER(Model):
+    """
+    Class for a gazetteer-only NER model, matching the `COUNTRIES`, the
+    `UN_BODIES` and the names of an entity dictionary without any neural model.
+    It is meant to triage large volumes of documents before sending selected
+    ones to the heavier models.
+
+    The entity dictionary is a JSON object mapping entity groups to names, either
+    as a list or as an object mapping each name to its canonical name:
+
+    ```json
+    {
+        "MISC": ["Sustainable Development Goals"],
+        "ORG": {"UNHCR": "UNHCR", "UN Refugee Agency": "UNHCR"}
+    }
+    ```
+    """
+
+    MODEL_NAME = "gazetteer"
+
+    def __init__(
+        self,
+        dictionaryPath: Optional[Path] = IOConsts.ENTITY_DICTIONARY_PATH,
+    ) -> None:
+        self.countriesGazetteer = TextUtils.getCountriesGazetteer()
+        self.unBodiesGazetteer = TextUtils.getUNBodiesGazetteer()
+        self.gazetteers: List[Gazetteer] = [
+            self.countriesGazetteer,
+            self.unBodiesGazetteer,
+        ]
+
+        if dictionaryPath is not None and Path(dictionaryPath).exists():
+            self.gazetteers.extend(self.loadDictionary(path=Path(dictionaryPath)))
+
+    @staticmethod
+    def loadDictionary(path: Path) -> List[Gazetteer]:
+        """
+        Load an entity dictionary, compiling a gazetteer per entity group.
+
+        Parameters
+        ----------
+        `path` : `Path`
+            The path of the JSON entity dictionary
+
+        Returns
+        -------
+        `List[Gazetteer]`
+            The gazetteers of the entity groups of the dictionary
+        """
+        with open(path, "r") as f:
+            dictionary: Dict[str, Any] = json.load(f)
+
+        gazetteers = [
+            Gazetteer(
+                names=(
+                    names if isinstance(names, dict) else {name: name for name in names}
+                ),
+                label=label,
+            )
+            for label, names in dictionary.items()
+            if names
+        ]
+
+        log(
+            f"Loaded {sum(len(names) for names in dictionary.values()):,} names"
+            + f" in {len(gazetteers):,} entity groups from {path}",
+            level="info",
+            verbose=True,
+        )
+
+        return gazetteers
+
+    def recognize(self, text: str) -> List[Dict[str, Any]]:
+        """
+        See doc for `NamedEntityRecognizer` class
+        """
+        return self.recognizeWithNames(text=text)[0]
+
+    def recognizeWithNames(
+        self,
+        text: str,
+    ) -> Tuple[List[Dict[str, Any]], List[str], List[str]]:
+        """
+        Recognize named entities in a text, along with the countries and the UN
+        bodies it mentions, so that they are matched only once.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text from which we need to extract named entities
+
+        Returns
+        -------
+        `Tuple[List[Dict[str, Any]], List[str], List[str]]`
+            The named entities, and the canonical names of the countries and of
+            the UN bodies found in the text, as returned by
+            `TextUtils.extractCountries` and `TextUtils.extractUNBodies`
+        """
+        matchesByGazetteer = [
+            gazetteer.findAll(text=text) for gazetteer in self.gazetteers
+        ]
+        # The countries and UN bodies gazetteers come first, see `__init__`
+        countries = sorted({match["canonical"] for match in matchesByGazetteer[0]})
+        unBodies = sorted({match["canonical"] for match in matchesByGazetteer[1]})
+
+        # Of overlapping matches of different gazetteers, the longest one is kept
+        entities: List[Dict[str, Any]] = []
+        end = 0
+        for match in sorted(
+            (match for matches in matchesByGazetteer for match in matches),
+            key=lambda m: (m["start"], -m["end"]),
+        ):
+            if match["start"] < end:
+                continue
+
+            end = match["end"]
+            entities.append(
+                {
+                    "entity_group": match["entity_group"],
+                    "score": None,  # Gazetteers do not provide a score
+                    "word": match["word"],
+                    "start": match["start"],
+                    "end": match["end"],
+                }
+            )
+
+        return entities, countries, unBodies
+
+    def recognizeBatch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        See doc for `NamedEntityRecognizer` class
+        """
+        return [self.recognize(text=text) for text in texts]
@@ -1,8 +1,13 @@
-from typing import Any, Dict, List
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
 
-from tqdm import tqdm
+import numpy as np
+import torch
+from transformers.pipelines.token_classification import AggregationStrategy
 
 from unml.models.model import Model
+from unml.utils.consts.model import ModelConsts
+from unml.utils.consts.ner import NERConsts
 from unml.utils.text import TextUtils
 
 
@@ -14,47 +19,239 @@ class RoBERTa(Model):
 
     MODEL_NAME = "Jean-Baptiste/roberta-large-ner-english"
 
-    def __init__(self, modelName: str = MODEL_NAME) -> None:
-        super().__init__(modelName=modelName, task="ner", aggregation_strategy="simple")
+    def __init__(
+        self,
+        modelName: str = MODEL_NAME,
+        backend: str = ModelConsts.DEFAULT_BACKEND,
+        quantize: bool = ModelConsts.QUANTIZE,
+        batchSize: int = NERConsts.BATCH_SIZE,
+    ) -> None:
+        super().__init__(
+            modelName=modelName,
+            task="ner",
+            backend=backend,
+            quantize=quantize,
+            aggregation_strategy="simple",
+        )
+        self.batchSize = batchSize
 
     def recognize(self, text: str) -> List[Dict[str, Any]]:
         """
         See doc for `NamedEntityRecognizer` class
         """
-        return self.recognizeFromChunked(text=text)
+        return self.recognizeBatch(texts=[text])[0]
 
-    def recognizeFromChunked(self, text: str) -> List[Dict[str, Any]]:
+    def recognizeBatch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
         """
-        Recognize named entities from text, chunking the text into smaller
-        pieces to avoid hitting the max sequence length limit.
+        Recognize named entities in several texts, chunking them into windows
+        overlapping by `ROBERTA_STRIDE` tokens to avoid hitting the max sequence
+        length limit. Each text is tokenized once, and the chunks of all the
+        texts are fed to the model as token IDs in batches. Entities found in
+        the overlap of two windows are merged, see `mergeEntities`.
 
         Parameters
         ----------
-        `text` : `str`
-            Text to recognize named entities from.
+        `texts` : `List[str]`
+            Texts to recognize named entities from.
 
         Returns
         -------
-        `List[Dict[str, Any]]`
-            List of named entities recognized from the text.
+        `List[List[Dict[str, Any]]]`
+            Named entities recognized from each text, with their `start`/`end`
+            offsets in the text.
         """
         tokenizer = self.model.tokenizer
+        maxChunkSize = (
+            tokenizer.model_max_length - tokenizer.num_special_tokens_to_add()
+        )
+
+        # Each chunk also has the character offsets at which its window cuts
+        # the text, `None` at the start and the end of the text
+        chunks: List[
+            Tuple[int, List[int], List[Tuple[int, int]], Optional[int], Optional[int]]
+        ] = []
+        for i, text in enumerate(texts):
+            inputIds, offsets = TextUtils.encodeWithOffsets(
+                text=text,
+                tokenizer=tokenizer,
+            )
+            for chunk in TextUtils.chunkInputIds(
+                inputIds=inputIds,
+                offsets=offsets,
+                text=text,
+                maxChunkSize=maxChunkSize,
+                stride=min(NERConsts.ROBERTA_STRIDE, maxChunkSize // 2),
+            ):
+                chunkOffsets = offsets[chunk["tokenStart"] : chunk["tokenEnd"]]
+                chunks.append(
+                    (
+                        i,
+                        chunk["inputIds"],
+                        chunkOffsets,
+                        chunkOffsets[0][0] if chunk["tokenStart"] > 0 else None,
+                        chunkOffsets[-1][1]
+                        if chunk["tokenEnd"] < len(inputIds)
+                        else None,
+                    )
+                )
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        atEdge: List[List[bool]] = [[] for _ in texts]
+        # Chunks of similar lengths are padded together
+        order = sorted(range(len(chunks)), key=lambda j: len(chunks[j][1]))
+        for bucketStart in range(0, len(order), self.batchSize):
+            bucket = [
+                chunks[j] for j in order[bucketStart : bucketStart + self.batchSize]
+            ]
+            bucketResults = self.recognizeIdsBatch(
+                texts=[texts[i] for i, *_ in bucket],
+                batch=[inputIds for _, inputIds, *_ in bucket],
+                offsets=[offsets for _, _, offsets, *_ in bucket],
+            )
+            for (i, _, _, cutStart, cutEnd), chunkResults in zip(bucket, bucketResults):
+                results[i].extend(chunkResults)
+                atEdge[i].extend(
+                    entity["start"] == cutStart or entity["end"] == cutEnd
+                    for entity in chunkResults
+                )
+
+        merged = [
+            self.mergeEntities(entities=entities, atEdge=edges)
+            for entities, edges in zip(results, atEdge)
+        ]
+
+        # Type casting for JSON serialization and cleaning
+        for entities in merged:
+            for entity in entities:
+                entity["score"] = float(f'{entity["score"]:.3f}')
+                entity["word"] = entity["word"].strip()
+
+        return merged
+
+    @staticmethod
+    def mergeEntities(
+        entities: List[Dict[str, Any]],
+        atEdge: Optional[List[bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge the entities recognized in overlapping chunks of a text. Of
+        overlapping entities, the ones touching the edge of their window are
+        dropped first, as the model only saw part of them, then the shorter
+        ones, e.g. `"Nations"` against `"United Nations"`. The score only breaks
+        the remaining ties.
+
+        Parameters
+        ----------
+        `entities` : `List[Dict[str, Any]]`
+            The entities of all the chunks of the text
+        `atEdge` : `Optional[List[bool]]`, optional
+            Whether each entity starts or ends where its window cuts the text,
+            by default `None`, for none of them
+
+        Returns
+        -------
+        `List[Dict[str, Any]]`
+            The non-overlapping entities, sorted by `start` offset
+        """
+        starts: List[int] = []
+        kept: List[Dict[str, Any]] = []
+
+        edges = atEdge if atEdge is not None else [False] * len(entities)
+        order = sorted(
+            range(len(entities)),
+            key=lambda j: (
+                edges[j],
+                entities[j]["start"] - entities[j]["end"],
+                -entities[j]["score"],
+                entities[j]["start"],
+            ),
+        )
+
+        for entity in (entities[j] for j in order):
+            # Kept entities do not overlap: only the last one starting before the
+            # end of the entity can overlap it
+            position = bisect_left(starts, entity["end"])
+            if position > 0 and kept[position - 1]["end"] > entity["start"]:
+                continue
+
+            starts.insert(position, entity["start"])
+            kept.insert(position, entity)
+
+        return kept
+
+    def recognizeIdsBatch(
+        self,
+        texts: List[str],
+        batch: List[List[int]],
+        offsets: List[List[Tuple[int, int]]],
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Recognize named entities in chunks of token IDs, without special tokens,
+        in a single forward pass.
+
+        Parameters
+        ----------
+        `texts` : `List[str]`
+            The full text each chunk comes from
+        `batch` : `List[List[int]]`
+            The token IDs of the chunks
+        `offsets` : `List[List[Tuple[int, int]]]`
+            The character span of each token of each chunk in its text
 
-        tokens = tokenizer.tokenize(text)
+        Returns
+        -------
+        `List[List[Dict[str, Any]]]`
+            The named entities of each chunk, grouped as with the `simple`
+            aggregation strategy, with their offsets in its text
+        """
+        tokenizer = self.model.tokenizer
 
-        chunkedTokens = TextUtils.chunkTokens(
-            tokens=tokens,
-            tokenizer=tokenizer,
+        ids = [
+            tokenizer.build_inputs_with_special_tokens(inputIds) for inputIds in batch
+        ]
+        inputs = tokenizer.pad({"input_ids": ids}, return_tensors="pt").to(
+            self.model.device
         )
+        with torch.inference_mode():
+            output = self.model.model(
+                input_ids=inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+            )
+        allLogits = output.logits.float().cpu().numpy()
+        attentionMask = inputs["attention_mask"].bool().cpu().numpy()
 
         results = []
-        for chunk in tqdm(chunkedTokens):
-            chunkResults = self.model(chunk)
-            results.extend(chunkResults)
+        for text, chunkIds, chunkOffsets, logits, mask in zip(
+            texts, ids, offsets, allLogits, attentionMask
+        ):
+            specialTokensMask = tokenizer.get_special_tokens_mask(
+                chunkIds,
+                already_has_special_tokens=True,
+            )
+            # Special tokens have empty spans and are skipped by the aggregation
+            offsetIterator = iter(chunkOffsets)
+            allOffsets = [
+                (0, 0) if isSpecial else next(offsetIterator)
+                for isSpecial in specialTokensMask
+            ]
 
-        # Type casting for JSON serialization and cleaning
-        for result in results:
-            result["score"] = float(f'{result["score"]:.3f}')
-            result["word"] = result["word"].strip()
+            # Drop the padding, on whichever side the tokenizer adds it
+            logits = logits[mask]
+
+            # Same softmax as the token classification pipeline
+            shiftedExp = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
+            scores = shiftedExp / shiftedExp.sum(axis=-1, keepdims=True)
+
+            preEntities = self.model.gather_pre_entities(
+                text,
+                np.array(chunkIds),
+                scores,
+                allOffsets,
+                np.array(specialTokensMask),
+                AggregationStrategy.SIMPLE,
+            )
+            results.append(
+                list(self.model.aggregate(preEntities, AggregationStrategy.SIMPLE))
+            )
 
         return results
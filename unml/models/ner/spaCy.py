@@ -1,8 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import spacy
 
 from unml.models.model import Model
+from unml.utils.consts.ner import NERConsts
+from unml.utils.text import TextUtils
 
 
 class spaCyNER(Model):
@@ -12,25 +14,72 @@ class spaCyNER(Model):
 
     MODEL_NAME = "en_core_web_trf"
 
-    def __init__(self, modelName: str = MODEL_NAME) -> None:
+    def __init__(
+        self,
+        modelName: str = MODEL_NAME,
+        batchSize: int = NERConsts.BATCH_SIZE,
+        nProcess: int = NERConsts.SPACY_N_PROCESS,
+    ) -> None:
         self.model = spacy.load(modelName)
+        # Only run the pipes NER depends on, e.g. not the parser nor the lemmatizer
+        self.model.select_pipes(
+            enable=[
+                pipe for pipe in self.model.pipe_names if pipe in NERConsts.SPACY_PIPES
+            ]
+        )
+        self.MODEL_NAME = modelName
+        self.batchSize = batchSize
+        self.nProcess = nProcess
 
     def recognize(self, text: str) -> List[Dict[str, Any]]:
         """
         See doc for `NamedEntityRecognizer` class
         """
-        entities = []
-        doc = self.model(text)
-
-        for entity in doc.ents:
-            entities.append(
-                {
-                    "entity_group": entity.label_,
-                    "score": None,  # spaCy does not provide a score
-                    "word": entity.text,
-                    "start": entity.start_char,
-                    "end": entity.end_char,
-                }
+        return self.recognizeBatch(texts=[text])[0]
+
+    def recognizeBatch(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Recognize named entities in several texts, streamed through `nlp.pipe`.
+        Texts longer than `SPACY_MAX_DOC_LENGTH` characters are split into
+        paragraph-sized docs, whose entities are mapped back to the offsets of
+        the text.
+
+        Parameters
+        ----------
+        `texts` : `List[str]`
+            The texts
+
+        Returns
+        -------
+        `List[List[Dict[str, Any]]]`
+            The named entities of each text, with their `start`/`end` offsets in
+            the text
+        """
+        pieces: List[Tuple[str, Tuple[int, int]]] = [
+            (text[start:end], (i, start))
+            for i, text in enumerate(texts)
+            for start, end in TextUtils.splitText(
+                text=text,
+                maxLength=NERConsts.SPACY_MAX_DOC_LENGTH,
             )
+        ]
+
+        entities: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        for doc, (i, offset) in self.model.pipe(
+            pieces,
+            as_tuples=True,
+            batch_size=self.batchSize,
+            n_process=self.nProcess,
+        ):
+            for entity in doc.ents:
+                entities[i].append(
+                    {
+                        "entity_group": entity.label_,
+                        "score": None,  # spaCy does not provide a score
+                        "word": entity.text,
+                        "start": offset + entity.start_char,
+                        "end": offset + entity.end_char,
+                    }
+                )
 
         return entities
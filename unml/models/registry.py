@@ -0,0 +1,57 @@
+"""
+This module contains the registry of the models. A model's module, and the ML
+framework it depends on (`torch`, `transformers`, `flair` or `spaCy`), is only
+imported the first time the model is selected, so that the CLI and the API do not
+pay the import time of the frameworks they do not use.
+"""
+import importlib
+import sys
+from functools import lru_cache
+from typing import Dict, Type
+
+from unml.models.model import Model
+
+# Module of each model, by model name as in `SummarizationConsts.ARGS_MAP` and
+# `NERConsts.ARGS_MAP`. The class of a model has the same name as the model
+MODEL_MODULES: Dict[str, str] = {
+    "DistilBARTCNN": "unml.models.summarize.DistilBARTCNN",
+    "DistilBARTXSUM": "unml.models.summarize.DistilBARTXSUM",
+    "DistilPegasusCNN": "unml.models.summarize.DistilPegasusCNN",
+    "LED": "unml.models.summarize.LED",
+    "LongT5": "unml.models.summarize.LongT5",
+    "RoBERTa": "unml.models.ner.RoBERTa",
+    "FLERT": "unml.models.ner.FLERT",
+    "spaCyNER": "unml.models.ner.spaCy",
+    "GazetteerNER": "unml.models.ner.GazetteerNER",
+}
+
+
+@lru_cache(maxsize=None)
+def getModelClass(name: str) -> Type[Model]:
+    """
+    Import the class of a model, with the framework it depends on.
+
+    Parameters
+    ----------
+    `name` : `str`
+        The name of the model, as in the values of `SummarizationConsts.ARGS_MAP`
+        and `NERConsts.ARGS_MAP`
+
+    Returns
+    -------
+    `Type[Model]`
+        The class of the model
+    """
+    assert (
+        name in MODEL_MODULES
+    ), f"Invalid model: {name}. Must be one of {set(MODEL_MODULES)}"
+
+    module = importlib.import_module(MODEL_MODULES[name])
+
+    # Silence the warnings of `transformers`, if the model's framework loaded it
+    if "transformers" in sys.modules:
+        from transformers.utils import logging as hfLogging
+
+        hfLogging.set_verbosity(40)
+
+    return getattr(module, name)
@@ -1,38 +1,23 @@
-from unml.models.model import Model
+from unml.models.summarize.SummarizationModel import SummarizationModel
+from unml.utils.consts.model import ModelConsts
 from unml.utils.consts.summarize import SummarizationConsts
 
 
-class LED(Model):
+class LED(SummarizationModel):
     """
     Class for LED (Beltagy et al., 2020) model
     https://arxiv.org/pdf/2004.05150
     """
 
     MODEL_NAME = "pszemraj/led-base-book-summary"
+    # The next level fits dozens of full-length summaries in the 16k token window
+    # of LED: intermediate summaries keep their length and only use fewer beams
+    INTERMEDIATE_MAX_LENGTH = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH
 
-    def __init__(self, modelName: str = MODEL_NAME) -> None:
-        super().__init__(modelName=modelName, task="summarization")
-
-    def summarize(
+    def __init__(
         self,
-        text: str,
-        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
-        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
-        doSample: bool = False,
-    ) -> str:
-        """
-        See doc for `Summarizer` class
-        """
-        output = self.model(
-            text,
-            min_length=minLength,
-            max_length=maxLength,
-            do_sample=doSample,
-            no_repeat_ngram_size=3,
-            encoder_no_repeat_ngram_size=3,
-            repetition_penalty=3.5,
-            num_beams=4,
-            early_stopping=True,
-        )
-
-        return str(output[0]["summary_text"])
+        modelName: str = MODEL_NAME,
+        backend: str = ModelConsts.DEFAULT_BACKEND,
+        quantize: bool = ModelConsts.QUANTIZE,
+    ) -> None:
+        super().__init__(modelName=modelName, backend=backend, quantize=quantize)
@@ -0,0 +1,227 @@
+from typing import Any, Dict, List
+
+from unml.models.model import Model
+from unml.utils.consts.model import ModelConsts
+from unml.utils.consts.summarize import SummarizationConsts
+
+
+class SummarizationModel(Model):
+    """
+    Generic class for a summarization model, generating summaries directly from
+    token IDs so that texts are only tokenized once.
+    """
+
+    # Generation parameters of the summaries making up the final output
+    GENERATION_PARAMS: Dict[str, Any] = {
+        "no_repeat_ngram_size": 3,
+        "encoder_no_repeat_ngram_size": 3,
+        "repetition_penalty": 3.5,
+        "num_beams": 4,
+        "early_stopping": True,
+    }
+    # Cheaper generation parameters of the intermediate summaries, which are
+    # only summarized again. Subclasses override them depending on the size of
+    # their window and their typical summary length
+    INTERMEDIATE_GENERATION_PARAMS: Dict[str, Any] = {
+        "no_repeat_ngram_size": 3,
+        "num_beams": 2,
+        "early_stopping": True,
+    }
+    INTERMEDIATE_MAX_LENGTH: int = 120
+
+    def __init__(
+        self,
+        modelName: str,
+        backend: str = ModelConsts.DEFAULT_BACKEND,
+        quantize: bool = ModelConsts.QUANTIZE,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(
+            modelName=modelName,
+            task="summarization",
+            backend=backend,
+            quantize=quantize,
+            **kwargs,
+        )
+
+        self.tokenizer = self.model.tokenizer
+
+        # Some models, e.g. T5, expect a task prefix which the pipeline would
+        # otherwise prepend to the text
+        prefix = getattr(self.model.model.config, "prefix", None) or ""
+        self.prefixIds: List[int] = (
+            self.tokenizer.encode(prefix, add_special_tokens=False) if prefix else []
+        )
+
+    def summarize(
+        self,
+        text: str,
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+    ) -> str:
+        """
+        See doc for `Summarizer` class
+        """
+        return self.summarizeIds(
+            inputIds=self.tokenizer.encode(text, add_special_tokens=False),
+            minLength=minLength,
+            maxLength=maxLength,
+            doSample=doSample,
+        )
+
+    def summarizeIds(
+        self,
+        inputIds: List[int],
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+    ) -> str:
+        """
+        Summarize a sequence of token IDs, without special tokens.
+
+        Parameters
+        ----------
+        `inputIds` : `List[int]`
+            The token IDs of the text, as returned by the model's tokenizer with
+            `add_special_tokens=False`
+        `minLength` : `int`, optional
+            Minimum length of the summary, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summary, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+
+        Returns
+        -------
+        `str`
+            The summary
+        """
+        return self.summarizeIdsBatch(
+            batch=[inputIds],
+            minLength=minLength,
+            maxLength=maxLength,
+            doSample=doSample,
+        )[0]
+
+    def getGenerationParams(
+        self,
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+        final: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Get the arguments of `generate` for a summary.
+
+        Parameters
+        ----------
+        `minLength` : `int`, optional
+            Minimum length of the summary, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summary, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+        `final` : `bool`, optional
+            Whether the summary is part of the final output, by default `True`.
+            Otherwise, the cheaper `INTERMEDIATE_GENERATION_PARAMS` are used and
+            the length is capped at `INTERMEDIATE_MAX_LENGTH`
+
+        Returns
+        -------
+        `Dict[str, Any]`
+            The arguments of `generate`
+        """
+        if not final:
+            maxLength = min(maxLength, self.INTERMEDIATE_MAX_LENGTH)
+            minLength = min(minLength, maxLength)
+
+        return {
+            "min_length": minLength,
+            "max_length": maxLength,
+            "do_sample": doSample,
+            **(
+                self.GENERATION_PARAMS if final else self.INTERMEDIATE_GENERATION_PARAMS
+            ),
+        }
+
+    def summarizeIdsBatch(
+        self,
+        batch: List[List[int]],
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+        batchSize: int = SummarizationConsts.BATCH_SIZE,
+        final: bool = True,
+    ) -> List[str]:
+        """
+        Summarize several sequences of token IDs, `batchSize` sequences per call
+        to the model. Sequences are sorted by length before being batched so
+        that sequences of similar lengths are padded together.
+
+        Parameters
+        ----------
+        `batch` : `List[List[int]]`
+            The token IDs of the texts, without special tokens
+        `minLength` : `int`, optional
+            Minimum length of the summaries, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summaries, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+        `batchSize` : `int`, optional
+            Maximum number of sequences per call to the model, by default
+            `BATCH_SIZE`
+        `final` : `bool`, optional
+            Whether the summaries are part of the final output, by default
+            `True`. See `getGenerationParams`
+
+        Returns
+        -------
+        `List[str]`
+            The summaries, in the order of `batch`
+        """
+        import torch
+
+        assert batchSize > 0, "batchSize must be strictly positive"
+
+        summaries: List[str] = [""] * len(batch)
+        order = sorted(range(len(batch)), key=lambda i: len(batch[i]))
+
+        for bucketStart in range(0, len(order), batchSize):
+            bucket = order[bucketStart : bucketStart + batchSize]
+            # Padding tokens are masked out by the attention mask, so that each
+            # summary is the same as if its sequence had been summarized alone
+            inputs = self.tokenizer.pad(
+                {
+                    "input_ids": [
+                        self.tokenizer.build_inputs_with_special_tokens(
+                            self.prefixIds + batch[i]
+                        )
+                        for i in bucket
+                    ]
+                },
+                return_tensors="pt",
+            ).to(self.model.device)
+
+            with torch.inference_mode():
+                output = self.model.model.generate(
+                    input_ids=inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    **self.getGenerationParams(
+                        minLength=minLength,
+                        maxLength=maxLength,
+                        doSample=doSample,
+                        final=final,
+                    ),
+                )
+
+            decoded = self.tokenizer.batch_decode(
+                output,
+                skip_special_tokens=True,
+                clean_up_tokenization_spaces=True,
+            )
+            for i, summary in zip(bucket, decoded):
+                summaries[i] = str(summary)
+
+        return summaries
@@ -1,11 +1,19 @@
-from typing import Any, Dict, List, Tuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, cast
 
-from unml.models.ner.FLERT import FLERT
-from unml.models.ner.RoBERTa import RoBERTa
-from unml.models.ner.spaCy import spaCyNER
+from unml.models.registry import getModelClass
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.model import ModelConsts
 from unml.utils.consts.ner import NERConsts
 from unml.utils.misc import log
 from unml.utils.text import TextUtils
+from unml.utils.types.recognition import Recognition
+
+if TYPE_CHECKING:
+    from unml.models.ner.FLERT import FLERT
+    from unml.models.ner.GazetteerNER import GazetteerNER
+    from unml.models.ner.RoBERTa import RoBERTa
+    from unml.models.ner.spaCy import spaCyNER
 
 
 class NamedEntityRecognizer:
@@ -13,22 +21,40 @@ class NamedEntityRecognizer:
     This class represents a general object to recognize named entities in text.
     """
 
-    nerExtractor: RoBERTa | FLERT | spaCyNER
+    nerExtractor: "RoBERTa | FLERT | spaCyNER | GazetteerNER"
 
     def __init__(
         self,
         model: str = NERConsts.DEFAULT_NER_MODEL,
+        backend: str = ModelConsts.DEFAULT_BACKEND,
+        quantize: bool = ModelConsts.QUANTIZE,
+        batchSize: int = NERConsts.BATCH_SIZE,
+        nProcess: int = NERConsts.SPACY_N_PROCESS,
+        dictionaryPath: Optional[Path] = IOConsts.ENTITY_DICTIONARY_PATH,
     ) -> None:
         parsedModel = NERConsts.ARGS_MAP[model]
+        self.isGazetteer = parsedModel == "GazetteerNER"
+        # Only the framework of the selected model is imported. Only transformers
+        # models support the `onnx` backend and quantization
+        modelClass = getModelClass(parsedModel)
         match parsedModel:
             case "RoBERTa":
-                self.nerExtractor = RoBERTa()
-            case "FLERT":
-                self.nerExtractor = FLERT()
+                self.nerExtractor = modelClass(  # type: ignore
+                    backend=backend,
+                    quantize=quantize,
+                    batchSize=batchSize,
+                )
             case "spaCyNER":
-                self.nerExtractor = spaCyNER()
+                self.nerExtractor = modelClass(  # type: ignore
+                    batchSize=batchSize,
+                    nProcess=nProcess,
+                )
+            case "GazetteerNER":
+                self.nerExtractor = modelClass(  # type: ignore
+                    dictionaryPath=dictionaryPath,
+                )
             case _:
-                self.nerExtractor = FLERT()
+                self.nerExtractor = modelClass(batchSize=batchSize)  # type: ignore
 
         log(
             f"NamedEntityRecognizer {parsedModel} instantiated with model {self.nerExtractor.MODEL_NAME}!",
@@ -40,7 +66,7 @@ class NamedEntityRecognizer:
         self,
         text: str,
         verbose: bool = False,
-    ) -> Tuple[Dict[str, int], List[str], List[str], List[Dict[str, Any]]]:
+    ) -> Recognition:
         """
         Recognize named entities in a text, using chunks of tokens fed
         sequentially to the model.
@@ -54,34 +80,73 @@ class NamedEntityRecognizer:
 
         Returns
         -------
-        `Tuple[Dict[str, int], List[str], List[str], List[Dict[str, Any]]]`
+        `Recognition`
             The cleaned list of named entities in the text as dictionnary with
             the entity and its frequency, the extracted countries, the extracted
             UN bodies and the detailed entities output
         """
-        results = self.nerExtractor.recognize(text=text)
-
-        cleanedEntities = self.cleanDetailedEntities(
-            detailedEntities=results,
-            verbose=verbose,
-        )
+        return self.recognizeBatch(texts=[text], verbose=verbose)[0]
 
-        countries = TextUtils.extractCountries(text=text)
-        bodies = TextUtils.extractUNBodies(text=text)
+    def recognizeBatch(
+        self,
+        texts: List[str],
+        verbose: bool = False,
+    ) -> List[Recognition]:
+        """
+        Recognize named entities in several texts at once, so that models
+        supporting it run them in shared batches.
 
-        log(
-            f"Named entities by chunking found: {len(cleanedEntities)}:,",
-            verbose=verbose,
-            level="success",
-        )
+        Parameters
+        ----------
+        `texts` : `List[str]`
+            The texts from which we need to extract named entities
+        `verbose` : `bool`, optional
+            Controls the verbose of the output, by default False
 
-        # Top 10 entities
-        log(
-            f"Top {min(10, len(cleanedEntities)):,} entities: {list(cleanedEntities.items())[:10]}",
-            verbose=verbose,
-            level="info",
-        )
-        return cleanedEntities, countries, bodies, results
+        Returns
+        -------
+        `List[Recognition]`
+            The results of each text, as returned by `recognize`
+        """
+        batchResults = []
+
+        if self.isGazetteer:
+            # The recognizer already matched the countries and the UN bodies
+            gazetteer = cast("GazetteerNER", self.nerExtractor)
+            recognized = [gazetteer.recognizeWithNames(text=text) for text in texts]
+        else:
+            recognized = [
+                (
+                    results,
+                    TextUtils.extractCountries(text=text),
+                    TextUtils.extractUNBodies(text=text),
+                )
+                for text, results in zip(
+                    texts, self.nerExtractor.recognizeBatch(texts=texts)
+                )
+            ]
+
+        for results, countries, bodies in recognized:
+            cleanedEntities = self.cleanDetailedEntities(
+                detailedEntities=results,
+                verbose=verbose,
+            )
+
+            log(
+                f"Named entities by chunking found: {len(cleanedEntities)}:,",
+                verbose=verbose,
+                level="success",
+            )
+
+            # Top 10 entities
+            log(
+                f"Top {min(10, len(cleanedEntities)):,} entities: {list(cleanedEntities.items())[:10]}",
+                verbose=verbose,
+                level="info",
+            )
+            batchResults.append((cleanedEntities, countries, bodies, results))
+
+        return batchResults
 
     def cleanDetailedEntities(
         self,
@@ -1,44 +1,65 @@
 """
 This module contains the general `Summarizer` class, to summarize a text.
 """
+import math
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
-
-from unml.models.summarize.DistilBARTCNN import DistilBARTCNN
-from unml.models.summarize.DistilBARTXSUM import DistilBARTXSUM
-from unml.models.summarize.DistilPegasusCNN import DistilPegasusCNN
-from unml.models.summarize.LED import LED
-from unml.models.summarize.LongT5 import LongT5
+from unml.models.registry import getModelClass
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.model import ModelConsts
 from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.extractive import ExtractiveFilter
+from unml.utils.memo import SummaryMemo
 from unml.utils.misc import log
 from unml.utils.text import TextUtils
 
+if TYPE_CHECKING:
+    from unml.models.summarize.SummarizationModel import SummarizationModel
+
 
 class Summarizer:
     """
     This class represents a general object to summarize text.
     """
 
-    summarizer: DistilBARTCNN | DistilBARTXSUM | DistilPegasusCNN | LED | LongT5
+    summarizer: "SummarizationModel"
 
     def __init__(
         self,
         model: str = SummarizationConsts.DEFAULT_SUMMARIZATION_MODEL,
+        batchSize: int = SummarizationConsts.BATCH_SIZE,
+        memoSize: int = IOConsts.SUMMARY_MEMO_MAX_SIZE_MB,
+        fanOut: int = SummarizationConsts.FAN_OUT,
+        workers: int = SummarizationConsts.REDUCE_WORKERS,
+        backend: str = ModelConsts.DEFAULT_BACKEND,
+        quantize: bool = ModelConsts.QUANTIZE,
+        levelAware: bool = SummarizationConsts.LEVEL_AWARE_DECODING,
+        extractiveBudget: int = SummarizationConsts.EXTRACTIVE_BUDGET,
     ) -> None:
+        assert fanOut >= 2, "fanOut must be at least 2"
+        assert workers > 0, "workers must be strictly positive"
+        assert extractiveBudget >= 0, "extractiveBudget must be positive"
+
         parsedModel = SummarizationConsts.ARGS_MAP[model]
-        match parsedModel:
-            case "DistilBARTCNN":
-                self.summarizer = DistilBARTCNN()
-            case "DistilBARTXSUM":
-                self.summarizer = DistilBARTXSUM()
-            case "DistilPegasusCNN":
-                self.summarizer = DistilPegasusCNN()
-            case "LED":
-                self.summarizer = LED()
-            case "LongT5":
-                self.summarizer = LongT5()
-            case _:
-                self.summarizer = LED()
+        # Only the framework of the selected model is imported
+        self.summarizer = getModelClass(parsedModel)(  # type: ignore
+            backend=backend,
+            quantize=quantize,
+        )
 
+        self.batchSize = batchSize
+        self.fanOut = fanOut
+        self.workers = workers
+        # Whether intermediate summaries use cheaper decoding settings
+        self.levelAware = levelAware
+        # Extractive pre-filter of the long texts. A budget of `0` disables it
+        self.extractiveBudget = extractiveBudget
+        self.extractiveFilter = ExtractiveFilter() if extractiveBudget > 0 else None
+        # Metrics of the last call to `summarizeBatch`
+        self.metrics: Dict[str, Any] = {}
+        # Persistent memo of chunk summaries. A size of `0` disables it
+        self.memo = SummaryMemo(maxBytes=memoSize * 1024**2) if memoSize > 0 else None
         self.tokenizer = self.summarizer.model.tokenizer
         self.maxChunkSize = self.tokenizer.model_max_length - 10
 
@@ -81,65 +102,475 @@ class Summarizer:
         """
         log("Summarizing document...", verbose=verbose, level="info")
 
-        # 1. Extract tokens from text
-        tokens = self.tokenizer.tokenize(text)
-        nTokens = len(tokens)
+        result = self.summarizeBatch(
+            texts=[text],
+            minLength=minLength,
+            maxLength=maxLength,
+            doSample=doSample,
+            verbose=verbose,
+        )[0]
+
+        log(f"Summary: {result}", verbose=verbose)
+        log(
+            f"Done! Summary is {len(result):,} characters long",
+            verbose=verbose,
+            level="success",
+        )
+
+        return result
+
+    def summarizeBatch(
+        self,
+        texts: List[str],
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+        verbose: bool = False,
+    ) -> List[str]:
+        """
+        Summarize several texts at once. The chunks of all the texts, and the
+        texts fitting in a single chunk, are summarized in shared batches. The
+        chunk summaries of each text are then reduced as a tree, see
+        `reduceSummaries`. If the extractive pre-filter is enabled, texts longer
+        than `extractiveBudget` tokens are first condensed to their most central
+        sentences, see `ExtractiveFilter`.
+
+        Parameters
+        ----------
+        `texts` : `List[str]`
+            The texts to be summarized
+        `minLength` : `int`, optional
+            Minimum length of the summaries, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summaries, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+        `verbose` : `bool`, optional
+            Verbose argument, by default False
+
+        Returns
+        -------
+        `List[str]`
+            The summaries, in the order of `texts`
+        """
+        metrics = {
+            "texts": len(texts),
+            "condensedTexts": 0,
+            "generateCalls": 0,
+            "summarizedChunks": 0,
+        }
+        depths = [1] * len(texts)
+
+        # 1. Tokenize each text once, keeping the character offsets of the tokens
+        encodings = [
+            TextUtils.encodeWithOffsets(text=text, tokenizer=self.tokenizer)
+            for text in texts
+        ]
+
+        log(
+            f"Number of tokens: {sum(len(ids) for ids, _ in encodings):,}"
+            + f" in {len(texts):,} texts",
+            verbose=verbose,
+            level="info",
+        )
+
+        # Only the most central sentences of the longest texts are summarized
+        if self.extractiveFilter is not None:
+            texts = list(texts)
+            for i, (inputIds, offsets) in enumerate(encodings):
+                if len(inputIds) <= self.extractiveBudget:
+                    continue
+
+                texts[i] = self.extractiveFilter.condense(
+                    text=texts[i],
+                    offsets=offsets,
+                    maxTokens=self.extractiveBudget,
+                )
+                encodings[i] = TextUtils.encodeWithOffsets(
+                    text=texts[i],
+                    tokenizer=self.tokenizer,
+                )
+                metrics["condensedTexts"] += 1
+
+            log(
+                f"Condensed {metrics['condensedTexts']:,} texts to at most"
+                + f" {self.extractiveBudget:,} tokens",
+                verbose=verbose,
+                level="info",
+            )
 
-        log(f"Number of tokens: {len(tokens):,}", verbose=verbose, level="info")
+        # 2. Chunk the texts longer than the maximum chunk size. The others are
+        # summarized directly
+        chunksPerText: List[List[List[int]]] = []
+        for text, (inputIds, offsets) in zip(texts, encodings):
+            if len(inputIds) <= self.maxChunkSize:
+                chunksPerText.append([inputIds])
+            else:
+                chunks = TextUtils.chunkInputIds(
+                    inputIds=inputIds,
+                    offsets=offsets,
+                    text=text,
+                    maxChunkSize=self.maxChunkSize,
+                )
+                chunksPerText.append([chunk["inputIds"] for chunk in chunks])
 
-        # If the number of tokens is less than the maximum chunk size,
-        # summarize the text directly
-        if len(tokens) <= self.maxChunkSize:
-            result = self.summarizer.summarize(
-                text=text,
+        log(
+            f"Number of chunks: {sum(len(c) for c in chunksPerText):,}",
+            verbose=verbose,
+            level="debug",
+        )
+
+        # 3. Summarize the chunks of all the texts, in batches of chunks of
+        # similar lengths. The chunk summaries which will be summarized again are
+        # generated separately, with cheaper decoding settings
+        summariesPerText: List[List[str]] = [[] for _ in texts]
+        for final in (True, False):
+            indices = [
+                i
+                for i, chunks in enumerate(chunksPerText)
+                if self.isFinalLevel(nNodes=len(chunks), maxLength=maxLength) == final
+            ]
+            if not indices:
+                continue
+
+            summaries = self.summarizeChunks(
+                chunks=[chunk for i in indices for chunk in chunksPerText[i]],
                 minLength=minLength,
                 maxLength=maxLength,
                 doSample=doSample,
+                metrics=metrics,
+                final=final,
             )
+            position = 0
+            for i in indices:
+                nChunks = len(chunksPerText[i])
+                summariesPerText[i] = summaries[position : position + nChunks]
+                position += nChunks
 
-        # Otherwise, chunk the tokens and summarize each chunk, and recursively
-        # summarize the result(s) until the result is less than the maximum chunk size
-        else:
-            resultTokens = tokens.copy()
-            while nTokens > self.maxChunkSize:
-                log(f"Input size: {nTokens:,}", verbose=verbose, level="debug")
-                # 2. Chunk the tokens
-                chunks = TextUtils.chunkTokens(
-                    tokens=resultTokens,
-                    tokenizer=self.tokenizer,
-                )
+        results: List[str] = [""] * len(texts)
+        leavesPerText: Dict[int, List[str]] = {}
+        for i, textSummaries in enumerate(summariesPerText):
+            if len(encodings[i][0]) <= self.maxChunkSize:
+                results[i] = textSummaries[0]
+            else:
+                leavesPerText[i] = textSummaries
 
-                log(
-                    f"Number of chunks: {len(chunks):,}", verbose=verbose, level="debug"
-                )
+        # 4. Reduce the chunk summaries of the longer texts
+        if leavesPerText:
+            reduced = self.reduceSummaries(
+                leavesPerText=leavesPerText,
+                minLength=minLength,
+                maxLength=maxLength,
+                doSample=doSample,
+                metrics=metrics,
+            )
+            for i, (result, depth) in reduced.items():
+                results[i] = result
+                depths[i] = depth
+
+        self.metrics = {**metrics, "depths": depths, "depth": max(depths, default=0)}
+
+        log(
+            f"Summarized {len(texts):,} texts with {metrics['generateCalls']:,}"
+            + f" generate calls on {metrics['summarizedChunks']:,} chunks,"
+            + f" max depth {self.metrics['depth']:,}",
+            verbose=verbose,
+            level="info",
+        )
+
+        return results
+
+    def isFinalLevel(
+        self,
+        nNodes: int,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+    ) -> bool:
+        """
+        Estimate whether the summaries of a level of a tree make up the final
+        summary, i.e. whether they will fit in the model's window together
+        instead of being summarized again.
+
+        Parameters
+        ----------
+        `nNodes` : `int`
+            The number of summaries of the level
+        `maxLength` : `int`, optional
+            Maximum length of the summaries, by default `SUMMARY_MAX_TOKEN_LENGTH`
+
+        Returns
+        -------
+        `bool`
+            Whether the summaries of the level should be generated with the
+            final decoding settings. Always `True` for a single summary, or if
+            `levelAware` is disabled
+        """
+        return (
+            not self.levelAware
+            or nNodes == 1
+            or nNodes * maxLength <= self.maxChunkSize
+        )
+
+    def reduceSummaries(
+        self,
+        leavesPerText: Dict[int, List[str]],
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+        metrics: Optional[Dict[str, int]] = None,
+    ) -> Dict[int, Tuple[str, int]]:
+        """
+        Reduce the chunk summaries of several texts as trees of fan-out
+        `self.fanOut`.
 
-                # 3. Summarize each chunk
-                summaries = []
-                for chunk in chunks:
-                    summary = self.summarizer.summarize(
-                        text=chunk,
+        Each group of `fanOut` sibling summaries is summarized again by a pool of
+        `self.workers` threads as soon as it is complete, without waiting for the
+        rest of its level, as long as the summaries of the level already known
+        are too long to fit in the model's window. Once all the summaries of a
+        level fit in the window together, the reduction stops and their
+        concatenation is the summary of the text.
+
+        Parameters
+        ----------
+        `leavesPerText` : `Dict[int, List[str]]`
+            The chunk summaries of each text, by index of the text
+        `minLength` : `int`, optional
+            Minimum length of the summaries, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summaries, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+        `metrics` : `Optional[Dict[str, int]]`, optional
+            Counters of generate calls and summarized chunks to update, by
+            default `None`
+
+        Returns
+        -------
+        `Dict[int, Tuple[str, int]]`
+            The summary of each text and the depth of its tree, counting the
+            level of the chunk summaries
+        """
+        fanOut = self.fanOut
+        # levels[i][d][j] is the j-th summary of depth d of text i
+        levels: Dict[int, List[List[Optional[str]]]] = {
+            i: [list(leaves)] for i, leaves in leavesPerText.items()
+        }
+        nTokens: Dict[Tuple[int, int], int] = {}
+        submitted: Set[Tuple[int, int, int]] = set()
+        results: Dict[int, Tuple[str, int]] = {}
+        tasks: Dict[Future[Tuple[str, Dict[str, int]]], Tuple[int, int, int]] = {}
+
+        def setNode(
+            pool: ThreadPoolExecutor, i: int, depth: int, j: int, summary: str
+        ) -> None:
+            """
+            Record a summary of a tree, then reduce the groups it completes.
+            """
+            level = levels[i][depth]
+            level[j] = summary
+            nTokens[(i, depth)] = nTokens.get((i, depth), 0) + len(
+                self.tokenizer.encode(summary, add_special_tokens=False)
+            )
+
+            isComplete = all(node is not None for node in level)
+            if isComplete:
+                joined = TextUtils.cleanText(text=" ".join(map(str, level)))
+                if len(level) == 1 or (
+                    len(self.tokenizer.encode(joined, add_special_tokens=False))
+                    <= self.maxChunkSize
+                ):
+                    results[i] = (joined, depth + 1)
+                    return
+
+            # The level cannot fit in the window: reduce its complete groups now
+            if not isComplete and nTokens[(i, depth)] <= self.maxChunkSize:
+                return
+
+            if len(levels[i]) == depth + 1:
+                levels[i].append([None] * math.ceil(len(level) / fanOut))
+
+            for g in range(len(levels[i][depth + 1])):
+                group = level[g * fanOut : (g + 1) * fanOut]
+                if (i, depth, g) in submitted or any(node is None for node in group):
+                    continue
+
+                submitted.add((i, depth, g))
+                if len(group) == 1:
+                    setNode(pool, i, depth + 1, g, str(group[0]))
+                else:
+                    future = pool.submit(
+                        self.reduceGroup,
+                        group=[str(node) for node in group],
                         minLength=minLength,
                         maxLength=maxLength,
                         doSample=doSample,
+                        final=self.isFinalLevel(
+                            nNodes=len(levels[i][depth + 1]),
+                            maxLength=maxLength,
+                        ),
                     )
-                    summaries.append(summary)
+                    tasks[future] = (i, depth + 1, g)
 
-                # 4. Join the summaries
-                result = TextUtils.cleanText(text="".join(summaries))
-                resultTokens = self.tokenizer.tokenize(result)
-                nTokens = len(resultTokens)
+        with ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="unml-summarize",
+        ) as pool:
+            for i, leaves in leavesPerText.items():
+                levels[i][0] = [None] * len(leaves)
+                for j, leaf in enumerate(leaves):
+                    setNode(pool, i, 0, j, leaf)
 
-                log(
-                    f"Number of tokens of the result: {len(resultTokens):,}",
-                    verbose=verbose,
-                    level="debug",
-                )
+            while tasks:
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, depth, g = tasks.pop(future)
+                    summary, groupMetrics = future.result()
 
-        log(f"Summary: {result}", verbose=verbose)
-        log(
-            f"Done! Summary is {len(result):,} characters long",
-            verbose=verbose,
-            level="success",
+                    if metrics is not None:
+                        for key, value in groupMetrics.items():
+                            metrics[key] = metrics.get(key, 0) + value
+
+                    setNode(pool, i, depth, g, summary)
+
+        return results
+
+    def reduceGroup(
+        self,
+        group: List[str],
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+        final: bool = True,
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Summarize a group of sibling summaries into a single one.
+
+        Parameters
+        ----------
+        `group` : `List[str]`
+            The sibling summaries
+        `minLength` : `int`, optional
+            Minimum length of the summary, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summary, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+        `final` : `bool`, optional
+            Whether the summary is part of the final output, by default `True`
+
+        Returns
+        -------
+        `Tuple[str, Dict[str, int]]`
+            The summary of the group, and the number of generate calls and
+            summarized chunks it took
+        """
+        metrics: Dict[str, int] = {}
+
+        joined = TextUtils.cleanText(text=" ".join(group))
+        inputIds, offsets = TextUtils.encodeWithOffsets(
+            text=joined,
+            tokenizer=self.tokenizer,
         )
 
-        return result
+        # With a large fan-out, the group may not fit in the window
+        chunks = TextUtils.chunkInputIds(
+            inputIds=inputIds,
+            offsets=offsets,
+            text=joined,
+            maxChunkSize=self.maxChunkSize,
+        )
+        summaries = self.summarizeChunks(
+            chunks=[chunk["inputIds"] for chunk in chunks],
+            minLength=minLength,
+            maxLength=maxLength,
+            doSample=doSample,
+            metrics=metrics,
+            final=final,
+        )
+
+        return TextUtils.cleanText(text=" ".join(summaries)), metrics
+
+    def summarizeChunks(
+        self,
+        chunks: List[List[int]],
+        minLength: int = SummarizationConsts.SUMMARY_MIN_LENGTH,
+        maxLength: int = SummarizationConsts.SUMMARY_MAX_TOKEN_LENGTH,
+        doSample: bool = False,
+        metrics: Optional[Dict[str, int]] = None,
+        final: bool = True,
+    ) -> List[str]:
+        """
+        Summarize chunks of token IDs in batches, reusing the summaries of the
+        chunks already summarized with the same model and parameters.
+
+        Parameters
+        ----------
+        `chunks` : `List[List[int]]`
+            The token IDs of the chunks
+        `minLength` : `int`, optional
+            Minimum length of the summaries, by default `SUMMARY_MIN_LENGTH`
+        `maxLength` : `int`, optional
+            Maximum length of the summaries, by default `SUMMARY_MAX_TOKEN_LENGTH`
+        `doSample` : `bool`, optional
+            To do sample or not, by default False
+        `metrics` : `Optional[Dict[str, int]]`, optional
+            Counters of generate calls and summarized chunks to update, by
+            default `None`
+        `final` : `bool`, optional
+            Whether the summaries are part of the final output, by default
+            `True`. Intermediate summaries use cheaper decoding settings
+
+        Returns
+        -------
+        `List[str]`
+            The summaries, in the order of `chunks`
+        """
+        summaries: List[Optional[str]] = [None] * len(chunks)
+        keys: List[str] = []
+
+        # Sampled summaries are not reproducible: they are never memoized
+        if self.memo is not None and not doSample:
+            keys = SummaryMemo.getKeys(
+                modelName=self.summarizer.modelName,
+                params={
+                    "backend": self.summarizer.backend,
+                    "quantize": self.summarizer.quantize,
+                    **self.summarizer.getGenerationParams(
+                        minLength=minLength,
+                        maxLength=maxLength,
+                        doSample=doSample,
+                        final=final,
+                    ),
+                },
+                chunks=chunks,
+            )
+            summaries = self.memo.get(keys=keys)
+
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        if missing:
+            newSummaries = self.summarizer.summarizeIdsBatch(
+                batch=[chunks[i] for i in missing],
+                minLength=minLength,
+                maxLength=maxLength,
+                doSample=doSample,
+                batchSize=self.batchSize,
+                final=final,
+            )
+
+            if keys:
+                self.memo.put(  # type: ignore
+                    keys=[keys[i] for i in missing],
+                    summaries=newSummaries,
+                )
+
+            for i, summary in zip(missing, newSummaries):
+                summaries[i] = summary
+
+            if metrics is not None:
+                metrics["generateCalls"] = metrics.get("generateCalls", 0) + (
+                    math.ceil(len(missing) / self.batchSize)
+                )
+                metrics["summarizedChunks"] = metrics.get("summarizedChunks", 0) + len(
+                    missing
+                )
+
+        return [str(summary) for summary in summaries]
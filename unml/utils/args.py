@@ -3,11 +3,16 @@ This module contains helpers to parse command line arguments.
 """
 
 from argparse import ArgumentParser
+from pathlib import Path
 from typing import Any, Dict, List
 
 from unml.utils.api import APIUtils
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.model import ModelConsts
 from unml.utils.consts.ner import NERConsts
+from unml.utils.consts.network import NetworkConsts
 from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.consts.text import TextConsts
 from unml.utils.misc import log
 
 
@@ -74,6 +79,147 @@ class ArgUtils:
             choices=NERConsts.ARGS_MAP.keys(),
             help="Model to use for NER",
         )
+        parser.add_argument(
+            "--entity-dictionary",
+            type=Path,
+            default=IOConsts.ENTITY_DICTIONARY_PATH,
+            help="JSON entity dictionary of the gazetteer recognizer, mapping"
+            + " entity groups to names",
+        )
+
+        parser.add_argument(
+            "--backend",
+            type=str,
+            default=ModelConsts.DEFAULT_BACKEND,
+            choices=ModelConsts.BACKENDS,
+            help="Inference backend of the transformers models",
+        )
+        parser.add_argument(
+            "--quantize",
+            action="store_true",
+            default=ModelConsts.QUANTIZE,
+            help="Quantize the transformers models to int8 for CPU inference",
+        )
+        parser.add_argument(
+            "--summary-batch-size",
+            type=int,
+            default=SummarizationConsts.BATCH_SIZE,
+            help="Maximum number of chunks summarized in a single call to the model",
+        )
+        parser.add_argument(
+            "--document-batch-size",
+            type=int,
+            default=SummarizationConsts.DOCUMENT_BATCH_SIZE,
+            help="Number of documents whose chunks are summarized in shared batches",
+        )
+        parser.add_argument(
+            "--torch-threads",
+            type=int,
+            default=ModelConsts.TORCH_THREADS,
+            help="Number of torch threads, shared by summarization and NER (0 to"
+            + " split the CPU cores evenly between them)",
+        )
+        parser.add_argument(
+            "--ner-batch-size",
+            type=int,
+            default=NERConsts.BATCH_SIZE,
+            help="Number of texts, or pieces of texts, recognized in a single call"
+            + " to the NER model",
+        )
+        parser.add_argument(
+            "--ner-processes",
+            type=int,
+            default=NERConsts.SPACY_N_PROCESS,
+            help="Number of processes running the spaCy NER pipeline",
+        )
+        parser.add_argument(
+            "--summary-memo-size",
+            type=int,
+            default=IOConsts.SUMMARY_MEMO_MAX_SIZE_MB,
+            help="Size budget of the memo of chunk summaries, in MB (0 to disable it)",
+        )
+        parser.add_argument(
+            "--fan-out",
+            type=int,
+            default=SummarizationConsts.FAN_OUT,
+            help="Number of sibling summaries reduced together",
+        )
+        parser.add_argument(
+            "--reduce-workers",
+            type=int,
+            default=SummarizationConsts.REDUCE_WORKERS,
+            help="Number of threads reducing groups of summaries concurrently",
+        )
+        parser.add_argument(
+            "--no-level-aware-decoding",
+            dest="level_aware_decoding",
+            action="store_false",
+            default=SummarizationConsts.LEVEL_AWARE_DECODING,
+            help="Generate intermediate summaries with the final decoding settings",
+        )
+        parser.add_argument(
+            "--extractive-budget",
+            type=int,
+            default=SummarizationConsts.EXTRACTIVE_BUDGET,
+            help="Condense texts to their most central sentences within this number"
+            + " of tokens before summarizing them. 0 disables the pre-filter",
+        )
+
+        parser.add_argument(
+            "--max-downloads",
+            type=int,
+            default=NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+            help="Maximum number of concurrent downloads",
+        )
+        parser.add_argument(
+            "--max-downloads-per-host",
+            type=int,
+            default=NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+            help="Maximum number of concurrent downloads per host",
+        )
+        parser.add_argument(
+            "--extraction-workers",
+            type=int,
+            default=TextConsts.EXTRACTION_WORKERS,
+            help="Number of worker processes extracting text (0 to use a thread)",
+        )
+        parser.add_argument(
+            "--save-downloads",
+            action="store_true",
+            default=IOConsts.SAVE_DOWNLOADS,
+            help="Also save downloaded files to the downloads folder",
+        )
+        parser.add_argument(
+            "--download-cache-size",
+            type=int,
+            default=IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+            help="Size budget of the download cache, in MB (0 to disable it)",
+        )
+        parser.add_argument(
+            "--no-text-store",
+            dest="text_store",
+            action="store_false",
+            default=IOConsts.USE_TEXT_STORE,
+            help="Do not reuse nor persist extracted texts across runs",
+        )
+        parser.add_argument(
+            "--page-range-threshold",
+            type=int,
+            default=TextConsts.PAGE_RANGE_THRESHOLD,
+            help="Page count from which PDFs are extracted in parallel page ranges (0 to disable)",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            default=False,
+            help="Stream documents through the pipeline stages as soon as they are ready",
+        )
+        parser.add_argument(
+            "--prefetch",
+            type=int,
+            default=NetworkConsts.PREFETCH_DEPTH,
+            help="Number of documents downloaded ahead of the models in streaming mode",
+        )
 
         parsedArgs = vars(parser.parse_args())
 
@@ -0,0 +1,280 @@
+"""
+This module contains the `DownloadCache` class, a content-addressed cache for
+downloaded documents.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from unml.utils.consts.io import IOConsts
+from unml.utils.misc import log
+
+
+class DownloadCache:
+    """
+    Content-addressed cache for downloaded documents.
+
+    Bodies are stored once per SHA-256 digest under `blobs/`, so that two URLs
+    serving the same file share a single blob and two different files with the
+    same basename never collide. A SQLite index maps each URL to its digest and
+    to the `ETag`/`Last-Modified` validators sent by the server, which are used
+    to revalidate entries with conditional requests. Least recently used blobs
+    are evicted to keep the cache under `maxBytes`.
+    """
+
+    def __init__(
+        self,
+        folder: Path = IOConsts.DOWNLOAD_CACHE_FOLDER,
+        maxBytes: int = IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB * 1024**2,
+        verbose: bool = False,
+    ) -> None:
+        self.folder = Path(folder)
+        self.blobsFolder = self.folder / "blobs"
+        self.maxBytes = maxBytes
+        self.verbose = verbose
+
+        os.makedirs(self.blobsFolder, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.folder / "index.sqlite",
+            check_same_thread=False,
+        )
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                etag TEXT,
+                lastModified TEXT
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                lastAccess REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blobsLastAccess ON blobs (lastAccess);
+            """
+        )
+        self._connection.commit()
+
+    def __del__(self) -> None:
+        """
+        DownloadCache destructor: when object gets destroyed, close the index
+        """
+        self._connection.close()
+
+    @staticmethod
+    def hashContent(content: bytes) -> str:
+        """
+        Compute the digest under which a content is stored.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The content to hash
+
+        Returns
+        -------
+        `str`
+            The hexadecimal SHA-256 digest of the content
+        """
+        return hashlib.sha256(content).hexdigest()
+
+    def _getBlobPath(self, digest: str) -> Path:
+        """
+        Get the path of the blob for a given digest.
+
+        Parameters
+        ----------
+        `digest` : `str`
+            The digest of the content
+
+        Returns
+        -------
+        `Path`
+            The path to the blob
+        """
+        return self.blobsFolder / digest[:2] / digest
+
+    def getHash(self, url: str) -> Optional[str]:
+        """
+        Get the digest of the content last downloaded from a given URL.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL of the document
+
+        Returns
+        -------
+        `Optional[str]`
+            The digest, `None` if the URL is not cached
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT hash FROM urls WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+        return None if row is None else str(row[0])
+
+    def getConditionalHeaders(self, url: str) -> Dict[str, str]:
+        """
+        Get the headers to revalidate the cached entry of a given URL.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL of the document
+
+        Returns
+        -------
+        `Dict[str, str]`
+            The `If-None-Match`/`If-Modified-Since` headers, empty if the URL
+            is not cached or has no validators
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT hash, etag, lastModified FROM urls WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+        if row is None or not self._getBlobPath(digest=row[0]).exists():
+            return {}
+
+        headers = {}
+        if row[1]:
+            headers["If-None-Match"] = row[1]
+        if row[2]:
+            headers["If-Modified-Since"] = row[2]
+
+        return headers
+
+    def read(self, url: str) -> Optional[bytes]:
+        """
+        Read the cached content of a given URL.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL of the document
+
+        Returns
+        -------
+        `Optional[bytes]`
+            The cached content, `None` if it is not in the cache
+        """
+        digest = self.getHash(url=url)
+
+        if digest is None:
+            return None
+
+        try:
+            content = self._getBlobPath(digest=digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            self._connection.execute(
+                "UPDATE blobs SET lastAccess = ? WHERE hash = ?",
+                (time.time(), digest),
+            )
+            self._connection.commit()
+
+        log(f"Cache hit for {url} ({digest[:12]})", level="debug", verbose=self.verbose)
+
+        return content
+
+    def store(
+        self,
+        url: str,
+        content: bytes,
+        etag: Optional[str] = None,
+        lastModified: Optional[str] = None,
+    ) -> str:
+        """
+        Store the content downloaded from a given URL, then evict least recently
+        used blobs if the cache is over budget.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL of the document
+        `content` : `bytes`
+            The downloaded content
+        `etag` : `Optional[str]`, optional
+            The `ETag` header of the response, by default `None`
+        `lastModified` : `Optional[str]`, optional
+            The `Last-Modified` header of the response, by default `None`
+
+        Returns
+        -------
+        `str`
+            The digest of the content
+        """
+        digest = self.hashContent(content=content)
+        blobPath = self._getBlobPath(digest=digest)
+
+        if not blobPath.exists():
+            os.makedirs(blobPath.parent, exist_ok=True)
+            # Write to a temporary file first so that readers never see a
+            # partially written blob
+            tmpPath = blobPath.with_suffix(f".{os.getpid()}.{threading.get_ident()}")
+            tmpPath.write_bytes(content)
+            os.replace(tmpPath, blobPath)
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)",
+                (url, digest, etag, lastModified),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)",
+                (digest, len(content), time.time()),
+            )
+            self._connection.commit()
+
+        self.evict()
+
+        return digest
+
+    def evict(self) -> None:
+        """
+        Evict least recently used blobs, and the URLs pointing to them, until the
+        total size of the cache is under `maxBytes`.
+        """
+        with self._lock:
+            totalSize = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()[0]
+
+            if totalSize <= self.maxBytes:
+                return
+
+            rows = self._connection.execute(
+                "SELECT hash, size FROM blobs ORDER BY lastAccess ASC"
+            ).fetchall()
+
+            nEvicted = 0
+            for digest, size in rows:
+                if totalSize <= self.maxBytes:
+                    break
+
+                self._getBlobPath(digest=digest).unlink(missing_ok=True)
+                self._connection.execute("DELETE FROM urls WHERE hash = ?", (digest,))
+                self._connection.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+                totalSize -= size
+                nEvicted += 1
+
+            self._connection.commit()
+
+        log(
+            f"Evicted {nEvicted:,} documents from the download cache",
+            level="info",
+            verbose=self.verbose,
+        )
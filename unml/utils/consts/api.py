@@ -1,5 +1,9 @@
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.model import ModelConsts
 from unml.utils.consts.ner import NERConsts
+from unml.utils.consts.network import NetworkConsts
 from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.consts.text import TextConsts
 
 
 class APIConsts:
@@ -13,4 +17,34 @@ class APIConsts:
         "verbose": True,
         "summarizer": SummarizationConsts.DEFAULT_SUMMARIZATION_MODEL,
         "recognizer": NERConsts.DEFAULT_NER_MODEL,
+        "entity_dictionary": IOConsts.ENTITY_DICTIONARY_PATH,
+        "backend": ModelConsts.DEFAULT_BACKEND,
+        "quantize": ModelConsts.QUANTIZE,
+        "torch_threads": ModelConsts.TORCH_THREADS,
+        "summary_batch_size": SummarizationConsts.BATCH_SIZE,
+        "document_batch_size": SummarizationConsts.DOCUMENT_BATCH_SIZE,
+        "ner_batch_size": NERConsts.BATCH_SIZE,
+        "ner_processes": NERConsts.SPACY_N_PROCESS,
+        "summary_memo_size": IOConsts.SUMMARY_MEMO_MAX_SIZE_MB,
+        "fan_out": SummarizationConsts.FAN_OUT,
+        "reduce_workers": SummarizationConsts.REDUCE_WORKERS,
+        "level_aware_decoding": SummarizationConsts.LEVEL_AWARE_DECODING,
+        "extractive_budget": SummarizationConsts.EXTRACTIVE_BUDGET,
+        "max_downloads": NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+        "max_downloads_per_host": NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+        "extraction_workers": TextConsts.EXTRACTION_WORKERS,
+        "save_downloads": IOConsts.SAVE_DOWNLOADS,
+        "download_cache_size": IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+        "page_range_threshold": TextConsts.PAGE_RANGE_THRESHOLD,
+        "text_store": IOConsts.USE_TEXT_STORE,
+        "stream": True,
+        "prefetch": NetworkConsts.PREFETCH_DEPTH,
     }
+
+    # Text run through the models at startup, so that the first request does
+    # not pay for the lazy initializations of the frameworks
+    WARMUP_TEXT = (
+        "The General Assembly of the United Nations adopted a resolution on"
+        + " climate change, calling on Member States, including France and Kenya,"
+        + " to strengthen their cooperation with UNEP and UNDP."
+    )
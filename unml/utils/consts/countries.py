@@ -216,3 +216,28 @@ COUNTRIES = {
     "Zambia",
     "Zimbabwe",
 }
+
+# Canonical name of the countries known under several names. Names missing from
+# this mapping are their own canonical name. Variants spelled with "&" instead of
+# "and" are matched automatically
+COUNTRY_ALIASES = {
+    "Antigua & Barbuda": "Antigua and Barbuda",
+    "Antigua Barbuda": "Antigua and Barbuda",
+    "Bolivia": "Bolivia (Plurinational State of)",
+    "Great Britain": "United Kingdom of Great Britain and Northern Ireland",
+    "Iran": "Iran (Islamic Republic of)",
+    "Laos": "Lao People's Democratic Republic",
+    "Micronesia": "Micronesia (Federated States of)",
+    "Netherlands": "Netherlands (Kingdom of the)",
+    "North Korea": "Democratic People's Republic of Korea",
+    "Palestine": "State of Palestine",
+    "Saint Kitts & Nevis": "Saint Kitts and Nevis",
+    "Salvador": "El Salvador",
+    "Syria": "Syrian Arab Republic",
+    "UAE": "United Arab Emirates",
+    "UK": "United Kingdom of Great Britain and Northern Ireland",
+    "United Kingdom": "United Kingdom of Great Britain and Northern Ireland",
+    "United States": "United States of America",
+    "USA": "United States of America",
+    "Vietnam": "Viet Nam",
+}
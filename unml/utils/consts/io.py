@@ -7,4 +7,31 @@ class IOConsts:
     """
 
     DOWNLOADS_FOLDER = Path.home() / ".unml" / "downloads"
+    # Whether downloaded files are also written to `DOWNLOADS_FOLDER`. Text is
+    # always extracted from memory
+    SAVE_DOWNLOADS = False
+
+    # Content-addressed download cache. A size of `0` disables the cache
+    DOWNLOAD_CACHE_FOLDER = Path.home() / ".unml" / "cache" / "downloads"
+    DOWNLOAD_CACHE_MAX_SIZE_MB = 2048
+
+    # Persistent store of extracted texts, keyed by content hash
+    TEXT_STORE_PATH = Path.home() / ".unml" / "cache" / "texts.sqlite"
+    USE_TEXT_STORE = True
+
+    # Persistent memo of chunk summaries. A size of `0` disables the memo
+    SUMMARY_MEMO_PATH = Path.home() / ".unml" / "cache" / "summaries.sqlite"
+    SUMMARY_MEMO_MAX_SIZE_MB = 256
+
+    # Models exported to ONNX for the `onnx` backend
+    ONNX_MODELS_FOLDER = Path.home() / ".unml" / "models" / "onnx"
+    # Models with int8 dynamic quantization
+    QUANTIZED_MODELS_FOLDER = Path.home() / ".unml" / "models" / "quantized"
+
+    # Entity dictionary of the `gazetteer` recognizer, loaded if it exists
+    ENTITY_DICTIONARY_PATH = Path.home() / ".unml" / "entities.json"
+
     PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+
+    # Fixed sample corpus of the benchmarks
+    BENCHMARK_CORPUS_PATH = PROJECT_ROOT / "res" / "benchmark" / "corpus.json"
@@ -4,3 +4,16 @@ class ModelConsts:
     """
 
     ML_TASKS = {"summarization", "automatic-speech-recognition", "ner", "translation"}
+
+    # Inference backends: PyTorch, or ONNX Runtime on CPU with models exported
+    # once to ONNX. The latter requires `optimum[onnxruntime]`
+    BACKENDS = {"torch", "onnx"}
+    DEFAULT_BACKEND = "torch"
+
+    # Whether to quantize the `Linear` layers of the models to int8 for CPU
+    # inference, with the torch backend
+    QUANTIZE = False
+
+    # Number of torch threads, shared by the summarization and NER stages which
+    # run concurrently. `0` splits the CPU cores evenly between the enabled stages
+    TORCH_THREADS = 0
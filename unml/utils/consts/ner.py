@@ -3,7 +3,7 @@ class NERConsts:
     Named Entity Recognition constants
     """
 
-    MODELS = {"RoBERTa", "FLERT", "spaCyNER"}
+    MODELS = {"RoBERTa", "FLERT", "spaCyNER", "GazetteerNER"}
 
     DEFAULT_NER_MODEL = "spacy"
 
@@ -11,4 +11,22 @@ class NERConsts:
         "roberta": "RoBERTa",
         "flert": "FLERT",
         "spacy": "spaCyNER",
+        "gazetteer": "GazetteerNER",
     }
+
+    # Maximum number of texts, or pieces of texts, recognized in a single call
+    # to the model
+    BATCH_SIZE = 16
+    # Number of processes running the `spaCy` pipeline, the pieces of texts
+    # longer than `SPACY_MAX_DOC_LENGTH` characters, and the pipes to run
+    SPACY_N_PROCESS = 1
+    SPACY_MAX_DOC_LENGTH = 5_000
+    SPACY_PIPES = {"transformer", "tok2vec", "ner"}
+    # Sentences longer than this many characters are split before FLERT tags them
+    FLERT_MAX_SENTENCE_LENGTH = 1_000
+    # Number of tokens shared by two consecutive chunks recognized by RoBERTa
+    ROBERTA_STRIDE = 64
+
+    # Entity groups of the names matched by the gazetteers
+    COUNTRY_LABEL = "LOC"
+    UN_BODY_LABEL = "ORG"
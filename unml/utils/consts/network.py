@@ -0,0 +1,31 @@
+class NetworkConsts:
+    """
+    Network constants
+    """
+
+    # Maximum number of documents downloaded at the same time
+    MAX_CONCURRENT_DOWNLOADS = 16
+    # Maximum number of documents downloaded at the same time from a single host
+    MAX_CONCURRENT_DOWNLOADS_PER_HOST = 4
+
+    # Maximum number of concurrent UNDL metadata lookups
+    MAX_CONCURRENT_METADATA_QUERIES = 16
+
+    # Number of documents downloaded ahead of the models in streaming mode
+    PREFETCH_DEPTH = 8
+    # Interval at which the streaming producer checks whether it has to stop, in
+    # seconds
+    STOP_POLL_INTERVAL = 0.5
+
+    # Timeouts, in seconds
+    TOTAL_TIMEOUT = 120
+    CONNECT_TIMEOUT = 15
+    READ_TIMEOUT = 60
+    KEEPALIVE_TIMEOUT = 30
+    DNS_CACHE_TTL = 300
+
+    # Retries with exponential backoff
+    MAX_RETRIES = 4
+    RETRY_BACKOFF_BASE = 0.5
+    RETRY_BACKOFF_MAX = 30.0
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
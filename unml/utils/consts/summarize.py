@@ -8,6 +8,29 @@ class SummarizationConsts:
     SUMMARY_MAX_TOKEN_LENGTH = 180
     DEFAULT_SUMMARIZATION_MODEL = "led"
 
+    # Maximum number of chunks summarized in a single call to the model
+    BATCH_SIZE = 8
+    # Number of documents whose chunks are gathered in shared batches
+    DOCUMENT_BATCH_SIZE = 16
+
+    # Number of sibling summaries reduced together, and number of threads
+    # reducing groups of summaries concurrently
+    FAN_OUT = 4
+    REDUCE_WORKERS = 2
+    # Whether the summaries which are summarized again are generated with
+    # cheaper decoding settings than the final ones
+    LEVEL_AWARE_DECODING = True
+
+    # Maximum number of tokens kept from a text by the extractive pre-filter
+    # before abstractive summarization, e.g. a few times the model's window.
+    # `0` disables the pre-filter
+    EXTRACTIVE_BUDGET = 0
+    # Parameters of the TF-IDF/TextRank ranking of the extractive pre-filter
+    TFIDF_MAX_FEATURES = 4096
+    TEXTRANK_DAMPING = 0.85
+    TEXTRANK_MAX_ITERATIONS = 100
+    TEXTRANK_TOLERANCE = 1e-6
+
     ARGS_MAP = {
         "pegasus": "DistilPegasusCNN",
         "bartcnn": "DistilBARTCNN",
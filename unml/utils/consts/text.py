@@ -0,0 +1,22 @@
+import os
+
+
+class TextConsts:
+    """
+    Text extraction constants
+    """
+
+    # Number of worker processes used to extract text from downloaded files.
+    # `0` extracts in a thread of the main process instead.
+    EXTRACTION_WORKERS = os.cpu_count() or 1
+    # Forking after `torch` has started its thread pools can deadlock the
+    # children, so extraction workers are spawned from a clean interpreter
+    EXTRACTION_START_METHOD = "spawn"
+    # Bump when the extraction or cleaning logic changes, to invalidate the
+    # texts persisted in the `TextStore`
+    EXTRACTION_VERSION = 2
+
+    # PDFs with at least this many pages are split into page ranges extracted in
+    # parallel by the workers. `0` disables splitting
+    PAGE_RANGE_THRESHOLD = 64
+    PAGES_PER_RANGE = 16
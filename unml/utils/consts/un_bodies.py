@@ -177,3 +177,9 @@ UN_BODIES = [
     "WMO",
     "World Meteorological Organization",
 ]
+
+# `UN_BODIES` lists each body as an (acronym, full name) pair, the acronym being
+# its canonical name. Acronyms spelled in several ways are mapped here
+UN_BODY_ALIASES = {
+    "UN-WOMEN": "UN Women",
+}
@@ -0,0 +1,357 @@
+"""
+This module contains the `DownloadEngine` class, to download documents concurrently.
+"""
+import asyncio
+import time
+from types import TracebackType
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from urllib.parse import urlparse
+
+import aiohttp
+
+from unml.utils.cache import DownloadCache
+from unml.utils.consts.network import NetworkConsts
+from unml.utils.misc import log
+
+
+class DownloadEngine:
+    """
+    Asynchronous download engine built around a single pooled `aiohttp` session.
+
+    Concurrency is bounded both globally and per host, connections are kept
+    alive and reused across requests, and transient failures (`429` and `5xx`
+    responses, timeouts and connection errors) are retried with exponential
+    backoff. If a `DownloadCache` is given, cached entries are revalidated with
+    conditional requests and unchanged documents are served from the cache
+    instead of being downloaded again. The engine has to be used as an async
+    context manager:
+
+    ```python
+    >>> async with DownloadEngine(maxConcurrency=8) as engine:
+    ...     content = await engine.fetch(url="https://undocs.org/A/RES/75/1")
+    ```
+    """
+
+    def __init__(
+        self,
+        maxConcurrency: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+        maxConcurrencyPerHost: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+        maxRetries: int = NetworkConsts.MAX_RETRIES,
+        headers: Optional[Dict[str, Any]] = None,
+        cache: Optional[DownloadCache] = None,
+        verbose: bool = False,
+    ) -> None:
+        assert maxConcurrency > 0, "maxConcurrency must be strictly positive"
+        assert (
+            maxConcurrencyPerHost > 0
+        ), "maxConcurrencyPerHost must be strictly positive"
+
+        self.maxConcurrency = maxConcurrency
+        self.maxConcurrencyPerHost = maxConcurrencyPerHost
+        self.maxRetries = maxRetries
+        self.headers = headers
+        self.cache = cache
+        self.verbose = verbose
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._globalSemaphore = asyncio.Semaphore(maxConcurrency)
+        self._hostSemaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Throughput statistics
+        self.nDocuments = 0
+        self.nFailures = 0
+        self.nRetries = 0
+        self.nBytes = 0
+        self.nCacheHits = 0
+        self._startTime = time.perf_counter()
+
+    async def __aenter__(self) -> "DownloadEngine":
+        """
+        Open the shared `aiohttp` session and its connection pool.
+
+        Returns
+        -------
+        `DownloadEngine`
+            The engine itself
+        """
+        connector = aiohttp.TCPConnector(
+            limit=self.maxConcurrency,
+            limit_per_host=self.maxConcurrencyPerHost,
+            keepalive_timeout=NetworkConsts.KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=NetworkConsts.DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=NetworkConsts.TOTAL_TIMEOUT,
+            connect=NetworkConsts.CONNECT_TIMEOUT,
+            sock_read=NetworkConsts.READ_TIMEOUT,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers=self.headers,
+        )
+        self._startTime = time.perf_counter()
+
+        return self
+
+    async def __aexit__(
+        self,
+        excType: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """
+        Close the shared session and log the throughput of the engine.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        self.logThroughput()
+
+    def _getHostSemaphore(self, url: str) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding the number of concurrent downloads for the
+        host of a given URL.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL to download
+
+        Returns
+        -------
+        `asyncio.Semaphore`
+            The semaphore of the host
+        """
+        host = urlparse(url).netloc
+
+        if host not in self._hostSemaphores:
+            self._hostSemaphores[host] = asyncio.Semaphore(self.maxConcurrencyPerHost)
+
+        return self._hostSemaphores[host]
+
+    @staticmethod
+    def _getRetryDelay(attempt: int, retryAfter: Optional[str] = None) -> float:
+        """
+        Compute the delay to wait before retrying a request, honouring the
+        `Retry-After` header when the server sends one in seconds.
+
+        Parameters
+        ----------
+        `attempt` : `int`
+            The index of the failed attempt, starting at `0`
+        `retryAfter` : `Optional[str]`, optional
+            The value of the `Retry-After` header, by default `None`
+
+        Returns
+        -------
+        `float`
+            The delay, in seconds
+        """
+        if retryAfter is not None and retryAfter.strip().isdigit():
+            return min(float(retryAfter), NetworkConsts.RETRY_BACKOFF_MAX)
+
+        return float(
+            min(
+                NetworkConsts.RETRY_BACKOFF_BASE * 2**attempt,
+                NetworkConsts.RETRY_BACKOFF_MAX,
+            )
+        )
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> Optional[bytes]:
+        """
+        Download the body of a given URL, retrying on transient failures.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL to download
+        `headers` : `Optional[Dict[str, Any]]`, optional
+            Headers to pass to the request on top of the engine's ones,
+            by default `None`
+
+        Returns
+        -------
+        `Optional[bytes]`
+            The body of the response, `None` if the download failed
+        """
+        content, _ = await self.fetchWithDigest(url=url, headers=headers)
+
+        return content
+
+    async def fetchWithDigest(
+        self,
+        url: str,
+        headers: Optional[Dict[str, Any]] = None,
+        isKnown: Optional[Callable[[str], bool]] = None,
+    ) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Download the body of a given URL and compute its SHA-256 digest, retrying
+        on transient failures.
+
+        Parameters
+        ----------
+        `url` : `str`
+            The URL to download
+        `headers` : `Optional[Dict[str, Any]]`, optional
+            Headers to pass to the request on top of the engine's ones,
+            by default `None`
+        `isKnown` : `Optional[Callable[[str], bool]]`, optional
+            Whether the content of a digest is already known downstream, e.g.
+            its text is in the `TextStore`. If the cached entry of the URL is
+            unchanged and known, its body is not even read from the cache, by
+            default `None`
+
+        Returns
+        -------
+        `Tuple[Optional[bytes], Optional[str]]`
+            The body of the response and its digest. The body is `None` if the
+            download failed, with a `None` digest, or if the content is known
+        """
+        assert (
+            self._session is not None
+        ), "DownloadEngine must be used as a context manager"
+
+        hostSemaphore = self._getHostSemaphore(url=url)
+        conditionalHeaders = (
+            await asyncio.to_thread(self.cache.getConditionalHeaders, url)
+            if self.cache is not None
+            else {}
+        )
+
+        reason = ""
+        for attempt in range(self.maxRetries + 1):
+            retryAfter: Optional[str] = None
+            etag: Optional[str] = None
+            lastModified: Optional[str] = None
+            status: Optional[int] = None
+            content: Optional[bytes] = None
+            try:
+                # Only the request holds the semaphores: hashing and cache writes
+                # happen once the connection is released to other downloads
+                async with self._globalSemaphore, hostSemaphore:
+                    async with self._session.get(
+                        url=url,
+                        headers={**(headers or {}), **conditionalHeaders},
+                    ) as response:
+                        status = response.status
+                        retryAfter = response.headers.get("Retry-After")
+                        etag = response.headers.get("ETag")
+                        lastModified = response.headers.get("Last-Modified")
+
+                        if status < 300:
+                            content = await response.read()
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = None
+                reason = repr(e)
+
+            if status == 304 and self.cache is not None:
+                digest = await asyncio.to_thread(self.cache.getHash, url)
+                if digest is not None and isKnown is not None:
+                    if await asyncio.to_thread(isKnown, digest):
+                        self.nCacheHits += 1
+                        return None, digest
+
+                cached = await asyncio.to_thread(self.cache.read, url)
+                if cached is not None:
+                    self.nCacheHits += 1
+                    return cached, digest
+
+                # The blob was evicted in the meantime: download it again
+                conditionalHeaders = {}
+                reason = "evicted cache entry"
+            elif status in NetworkConsts.RETRY_STATUSES:
+                reason = f"HTTP {status}"
+            elif status is not None and content is None:
+                log(
+                    f"Unable to get url {url}: HTTP {status}",
+                    level="error",
+                    verbose=self.verbose,
+                )
+                self.nFailures += 1
+                return None, None
+            elif content is not None:
+                self.nDocuments += 1
+                self.nBytes += len(content)
+
+                # The digest is computed once, by the cache if there is one
+                digest = (
+                    await asyncio.to_thread(
+                        self.cache.store,
+                        url=url,
+                        content=content,
+                        etag=etag,
+                        lastModified=lastModified,
+                    )
+                    if self.cache is not None
+                    else await asyncio.to_thread(DownloadCache.hashContent, content)
+                )
+
+                return content, digest
+
+            if attempt == self.maxRetries:
+                break
+
+            delay = self._getRetryDelay(attempt=attempt, retryAfter=retryAfter)
+            self.nRetries += 1
+            log(
+                f"Retrying {url} in {delay:.1f}s ({reason}, attempt {attempt + 1}/{self.maxRetries})",
+                level="warning",
+                verbose=self.verbose,
+            )
+            await asyncio.sleep(delay)
+
+        log(
+            f"Unable to get url {url} after {self.maxRetries + 1} attempts ({reason})",
+            level="error",
+            verbose=self.verbose,
+        )
+        self.nFailures += 1
+
+        return None, None
+
+    def getThroughput(self) -> Dict[str, float]:
+        """
+        Get the throughput statistics of the engine since it was opened.
+
+        Returns
+        -------
+        `Dict[str, float]`
+            The elapsed time, the number of downloaded documents, cache hits,
+            failures and retries, and the throughput in documents/s and MB/s
+        """
+        elapsed = max(time.perf_counter() - self._startTime, 1e-9)
+
+        return {
+            "elapsed": elapsed,
+            "documents": self.nDocuments,
+            "failures": self.nFailures,
+            "retries": self.nRetries,
+            "cacheHits": self.nCacheHits,
+            "megabytes": self.nBytes / 1e6,
+            "docsPerSecond": self.nDocuments / elapsed,
+            "megabytesPerSecond": self.nBytes / 1e6 / elapsed,
+        }
+
+    def logThroughput(self) -> None:
+        """
+        Log the throughput statistics of the engine.
+        """
+        stats = self.getThroughput()
+
+        log(
+            f"Downloaded {stats['documents']:,} documents ({stats['megabytes']:,.2f} MB)"
+            + f" in {stats['elapsed']:.2f}s: {stats['docsPerSecond']:.2f} docs/s,"
+            + f" {stats['megabytesPerSecond']:.2f} MB/s"
+            + f" ({stats['cacheHits']:,} served from cache, {stats['failures']:,}"
+            + f" failures, {stats['retries']:,} retries)",
+            level="success",
+            verbose=self.verbose,
+        )
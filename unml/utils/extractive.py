@@ -0,0 +1,327 @@
+"""
+This module contains the `ExtractiveFilter` class, an extractive pre-filter condensing
+long texts before their abstractive summarization.
+"""
+import re
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+from unml.utils.consts.summarize import SummarizationConsts
+from unml.utils.text import TextUtils
+
+
+class ExtractiveFilter:
+    """
+    Extractive summarizer keeping the most central sentences of a text within a
+    token budget, so that only a condensed text goes through the costly
+    abstractive model.
+
+    Sentences are represented by their TF-IDF vectors and ranked with TextRank on
+    the graph of their cosine similarities. The similarity matrix is never
+    materialized: each iteration only takes two products with the TF-IDF
+    matrix, which keeps ranking the thousands of sentences of a long report
+    linear in their number. Repeated sentences, e.g. procedural boilerplate, are
+    only ranked once.
+    """
+
+    SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+    WORD = re.compile(r"\w+")
+
+    def __init__(
+        self,
+        maxFeatures: int = SummarizationConsts.TFIDF_MAX_FEATURES,
+        damping: float = SummarizationConsts.TEXTRANK_DAMPING,
+        maxIterations: int = SummarizationConsts.TEXTRANK_MAX_ITERATIONS,
+        tolerance: float = SummarizationConsts.TEXTRANK_TOLERANCE,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        `maxFeatures` : `int`, optional
+            Maximum number of words of the TF-IDF vectors, by default
+            `TFIDF_MAX_FEATURES`
+        `damping` : `float`, optional
+            Damping factor of TextRank, by default `TEXTRANK_DAMPING`
+        `maxIterations` : `int`, optional
+            Maximum number of power iterations of TextRank, by default
+            `TEXTRANK_MAX_ITERATIONS`
+        `tolerance` : `float`, optional
+            L1 change of the scores under which TextRank has converged, by
+            default `TEXTRANK_TOLERANCE`
+        """
+        self.maxFeatures = maxFeatures
+        self.damping = damping
+        self.maxIterations = maxIterations
+        self.tolerance = tolerance
+
+    @staticmethod
+    def splitSentences(text: str) -> List[Tuple[int, int]]:
+        """
+        Split a text into sentences.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to split
+
+        Returns
+        -------
+        `List[Tuple[int, int]]`
+            The `(start, end)` character span of each sentence in the text
+        """
+        spans: List[Tuple[int, int]] = []
+        start = 0
+
+        for match in ExtractiveFilter.SENTENCE_BOUNDARY.finditer(text):
+            spans.append((start, match.start()))
+            start = match.end()
+        spans.append((start, len(text)))
+
+        return [(start, end) for start, end in spans if end > start]
+
+    def getTFIDF(self, sentences: List[str]) -> np.ndarray:
+        """
+        Compute the L2-normalized TF-IDF vectors of sentences.
+
+        Parameters
+        ----------
+        `sentences` : `List[str]`
+            The sentences
+
+        Returns
+        -------
+        `np.ndarray`
+            The `(len(sentences), nWords)` TF-IDF matrix, with a sublinear term
+            frequency. Sentences without any kept word have a null vector
+        """
+        n = len(sentences)
+        words = [self.WORD.findall(sentence.lower()) for sentence in sentences]
+
+        documentFrequencies = Counter(word for w in words for word in set(w))
+        # Words of a single sentence never link two sentences, and words of most
+        # sentences link all of them
+        vocabulary = [
+            word
+            for word, frequency in documentFrequencies.most_common()
+            if 1 < frequency <= n / 2
+        ][: self.maxFeatures]
+        index = {word: j for j, word in enumerate(vocabulary)}
+
+        rows = [i for i, w in enumerate(words) for word in w if word in index]
+        columns = [index[word] for w in words for word in w if word in index]
+
+        tf = np.zeros((n, len(vocabulary)), dtype=np.float32)
+        np.add.at(tf, (rows, columns), 1)
+
+        idf = np.log(
+            n / np.array([documentFrequencies[w] for w in vocabulary], dtype=np.float32)
+        )
+        tfidf = np.log1p(tf) * idf
+
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+
+        return tfidf / np.where(norms > 0, norms, 1)
+
+    def rank(self, tfidf: np.ndarray) -> np.ndarray:
+        """
+        Rank sentences with TextRank on the graph of the cosine similarities of
+        their TF-IDF vectors, without self-loops.
+
+        Parameters
+        ----------
+        `tfidf` : `np.ndarray`
+            The normalized TF-IDF matrix of the sentences, as returned by
+            `getTFIDF`
+
+        Returns
+        -------
+        `np.ndarray`
+            The score of each sentence, summing to `1`
+        """
+        n = len(tfidf)
+        # The similarity matrix is S = tfidf @ tfidf.T minus its diagonal
+        diagonal = (tfidf * tfidf).sum(axis=1)
+        degrees = tfidf @ tfidf.sum(axis=0) - diagonal
+        isDangling = degrees <= 1e-9
+
+        scores = np.full(n, 1 / n, dtype=np.float32)
+        for _ in range(self.maxIterations):
+            weighted = np.where(
+                isDangling, 0, scores / np.where(isDangling, 1, degrees)
+            )
+            # Sentences without neighbours spread their score uniformly
+            spread = scores[isDangling].sum() / n
+            newScores = (1 - self.damping) / n + self.damping * (
+                tfidf @ (tfidf.T @ weighted) - diagonal * weighted + spread
+            )
+
+            hasConverged = np.abs(newScores - scores).sum() < self.tolerance
+            scores = newScores
+            if hasConverged:
+                break
+
+        return scores
+
+    @staticmethod
+    def countTokens(
+        spans: List[Tuple[int, int]],
+        tokenStarts: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Count the tokens of character spans of a text.
+
+        Parameters
+        ----------
+        `spans` : `List[Tuple[int, int]]`
+            The `(start, end)` character spans
+        `tokenStarts` : `np.ndarray`
+            The sorted start offset of each token of the text
+
+        Returns
+        -------
+        `np.ndarray`
+            The number of tokens starting in each span
+        """
+        return np.searchsorted(
+            tokenStarts, [end for _, end in spans]
+        ) - np.searchsorted(tokenStarts, [start for start, _ in spans])
+
+    def splitLongSentences(
+        self,
+        text: str,
+        spans: List[Tuple[int, int]],
+        offsets: List[Tuple[int, int]],
+        maxTokens: int,
+    ) -> List[Tuple[int, int]]:
+        """
+        Split the sentences longer than a token budget, e.g. the text of PDF
+        files whose lines or table rows never start with a capital letter, into
+        pieces that fit in it.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text
+        `spans` : `List[Tuple[int, int]]`
+            The character span of each sentence, as returned by
+            `splitSentences`
+        `offsets` : `List[Tuple[int, int]]`
+            The character span of each token of the text
+        `maxTokens` : `int`
+            The token budget
+
+        Returns
+        -------
+        `List[Tuple[int, int]]`
+            The character spans of the sentences and of the pieces of the long
+            ones, in order, each of at least one and at most `maxTokens` tokens
+        """
+        tokenStarts = np.array([start for start, _ in offsets])
+        pieces: List[Tuple[int, int]] = []
+
+        for (start, end), nTokens in zip(
+            spans, self.countTokens(spans=spans, tokenStarts=tokenStarts)
+        ):
+            if nTokens <= maxTokens:
+                pieces.append((start, end))
+                continue
+
+            # Pieces end on paragraph breaks, sentence ends or whitespace, see
+            # `TextUtils.splitText`, with a length estimated from the mean token
+            # length of the sentence
+            for pieceStart, pieceEnd in TextUtils.splitText(
+                text=text[start:end],
+                maxLength=max(1, (end - start) * maxTokens // nTokens),
+            ):
+                pieceStart, pieceEnd = start + pieceStart, start + pieceEnd
+                first, last = np.searchsorted(tokenStarts, [pieceStart, pieceEnd])
+
+                # The estimate is not exact: pieces still too long are cut on
+                # their tokens
+                for i in range(first, last, maxTokens):
+                    pieces.append(
+                        (
+                            offsets[i][0] if i > first else pieceStart,
+                            min(pieceEnd, offsets[i + maxTokens - 1][1])
+                            if i + maxTokens < last
+                            else pieceEnd,
+                        )
+                    )
+
+        return [
+            span
+            for span, nTokens in zip(
+                pieces, self.countTokens(spans=pieces, tokenStarts=tokenStarts)
+            )
+            if nTokens > 0
+        ]
+
+    def condense(
+        self,
+        text: str,
+        offsets: List[Tuple[int, int]],
+        maxTokens: int,
+    ) -> str:
+        """
+        Keep the highest ranked sentences of a text that fit in a token budget,
+        in their order of appearance. Sentences longer than the budget are split,
+        so that a non-empty text is never condensed to an empty one.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to condense
+        `offsets` : `List[Tuple[int, int]]`
+            The character span of each token of the text, as returned by
+            `TextUtils.encodeWithOffsets`
+        `maxTokens` : `int`
+            The token budget of the condensed text, strictly positive
+
+        Returns
+        -------
+        `str`
+            The condensed text, the text itself if it fits in the budget
+        """
+        assert maxTokens > 0, "maxTokens must be strictly positive"
+
+        if len(offsets) <= maxTokens:
+            return text
+
+        spans = self.splitLongSentences(
+            text=text,
+            spans=self.splitSentences(text=text),
+            offsets=offsets,
+            maxTokens=maxTokens,
+        )
+        sentences = [text[start:end] for start, end in spans]
+        tokenCounts = self.countTokens(
+            spans=spans,
+            tokenStarts=np.array([start for start, _ in offsets]),
+        )
+
+        # Only the first occurrence of a repeated sentence is kept
+        seen = set()
+        unique: List[int] = []
+        for i, sentence in enumerate(sentences):
+            key = " ".join(sentence.lower().split())
+            if key not in seen:
+                seen.add(key)
+                unique.append(i)
+
+        scores = self.rank(tfidf=self.getTFIDF([sentences[i] for i in unique]))
+
+        selected: List[int] = []
+        nTokens = 0
+        for k in np.argsort(-scores, kind="stable"):
+            i = unique[k]
+            if nTokens + tokenCounts[i] <= maxTokens:
+                selected.append(i)
+                nTokens += tokenCounts[i]
+
+        condensed = " ".join(sentences[i] for i in sorted(selected))
+
+        # Every sentence fits in the budget, so that the highest ranked one is
+        # always kept. Truncating the text is only a safeguard
+        return condensed if condensed.strip() else text[: offsets[maxTokens - 1][1]]
@@ -0,0 +1,219 @@
+"""
+This module contains the `Gazetteer` class, a precompiled multi-pattern matcher for
+lists of known names such as countries and UN bodies.
+"""
+import re
+from typing import Any, Dict, Iterable, List
+
+
+class Gazetteer:
+    """
+    Matcher finding all the occurrences of a fixed set of names in a text in a
+    single pass.
+
+    The names are inserted in a character trie which is compiled once into a
+    regular expression, so that the regex engine walks the trie instead of trying
+    each name in turn. Alternatives of a node are tried before ending the match
+    there, which gives leftmost-longest matches: "Equatorial Guinea" is matched
+    as a whole and not as "Guinea". A match has to start and end on a word
+    boundary, and the spaces of a name match any run of whitespace. Every name
+    is mapped to a canonical name, so that aliases are counted together:
+
+    ```python
+    >>> gazetteer = Gazetteer(
+    ...     names={"Antigua and Barbuda": "Antigua and Barbuda", "UK": "United Kingdom"},
+    ...     label="LOC",
+    ... )
+    >>> gazetteer.count("Antigua & Barbuda and the UK")
+    {'Antigua and Barbuda': 1, 'United Kingdom': 1}
+    ```
+    """
+
+    def __init__(
+        self,
+        names: Dict[str, str],
+        label: str,
+        caseSensitive: bool = True,
+    ) -> None:
+        """
+        Build and compile the matcher.
+
+        Parameters
+        ----------
+        `names` : `Dict[str, str]`
+            The names to match, mapped to their canonical name. Variants spelled
+            with "&" instead of "and", and conversely, are added automatically
+        `label` : `str`
+            The entity group of the matches, e.g. `LOC` or `ORG`
+        `caseSensitive` : `bool`, optional
+            Whether matching is case sensitive, by default `True`. Acronyms such
+            as "WHO" need a case-sensitive match
+        """
+        self.label = label
+        self.caseSensitive = caseSensitive
+        self.canonicalNames: Dict[str, str] = {}
+
+        for name, canonical in names.items():
+            for variant in self._getVariants(name=name):
+                self.canonicalNames.setdefault(self._normalize(variant), canonical)
+
+        self.pattern = re.compile(
+            r"(?<!\w)" + self._compileTrie(names=self.canonicalNames) + r"(?!\w)",
+            flags=0 if caseSensitive else re.IGNORECASE,
+        )
+
+    @staticmethod
+    def _getVariants(name: str) -> List[str]:
+        """
+        Get the spellings of a name to match.
+
+        Parameters
+        ----------
+        `name` : `str`
+            The name
+
+        Returns
+        -------
+        `List[str]`
+            The name, and its variant with "&" and "and" swapped if any
+        """
+        variants = [name]
+
+        if " & " in name:
+            variants.append(name.replace(" & ", " and "))
+        elif " and " in name:
+            variants.append(name.replace(" and ", " & "))
+
+        return variants
+
+    def _normalize(self, name: str) -> str:
+        """
+        Normalize a name or a matched text to look up its canonical name.
+
+        Parameters
+        ----------
+        `name` : `str`
+            The name
+
+        Returns
+        -------
+        `str`
+            The name with harmonized spacing, lowercased if matching is not case
+            sensitive
+        """
+        name = " ".join(name.split())
+
+        return name if self.caseSensitive else name.lower()
+
+    @staticmethod
+    def _compileTrie(names: Iterable[str]) -> str:
+        """
+        Compile names into a regular expression following their character trie.
+
+        Parameters
+        ----------
+        `names` : `Iterable[str]`
+            The normalized names
+
+        Returns
+        -------
+        `str`
+            The pattern matching any of the names
+        """
+        # A key of `""` marks the end of a name
+        trie: Dict[str, Any] = {}
+        for name in names:
+            node = trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def toPattern(node: Dict[str, Any]) -> str:
+            """
+            Compile the subtree of a trie node into a regular expression.
+            """
+            alternatives = [
+                (r"\s+" if char == " " else re.escape(char)) + toPattern(child)
+                for char, child in sorted(node.items())
+                if char
+            ]
+            # Ending the match here is only tried once longer names have failed
+            if "" in node:
+                alternatives.append("")
+
+            if len(alternatives) == 1:
+                return alternatives[0]
+
+            return "(?:" + "|".join(alternatives) + ")"
+
+        return toPattern(trie)
+
+    def findAll(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Find all the names in a text.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to search
+
+        Returns
+        -------
+        `List[Dict[str, Any]]`
+            The matches in order of appearance, each as a
+            `{"entity_group", "word", "canonical", "start", "end"}` object
+        """
+        return [
+            {
+                "entity_group": self.label,
+                "word": match.group(),
+                "canonical": self.canonicalNames[self._normalize(match.group())],
+                "start": match.start(),
+                "end": match.end(),
+            }
+            for match in self.pattern.finditer(text)
+        ]
+
+    def extract(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Find all the names in a text, grouped by canonical name.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to search
+
+        Returns
+        -------
+        `Dict[str, Dict[str, Any]]`
+            The canonical names found, sorted alphabetically, each with its
+            `count` and the `spans` of its occurrences
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+
+        for match in self.findAll(text=text):
+            entry = found.setdefault(match["canonical"], {"count": 0, "spans": []})
+            entry["count"] += 1
+            entry["spans"].append((match["start"], match["end"]))
+
+        return dict(sorted(found.items()))
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count the occurrences of the names in a text.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to search
+
+        Returns
+        -------
+        `Dict[str, int]`
+            The canonical names found, sorted alphabetically, with their number
+            of occurrences
+        """
+        return {
+            canonical: entry["count"]
+            for canonical, entry in self.extract(text=text).items()
+        }
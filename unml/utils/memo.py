@@ -0,0 +1,204 @@
+"""
+This module contains the `SummaryMemo` class, a persistent memo of chunk summaries.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from unml.utils.consts.io import IOConsts
+from unml.utils.misc import log
+
+
+class SummaryMemo:
+    """
+    Persistent memo of the summaries of chunks, in a single SQLite file.
+
+    A summary is keyed by the digest of the model name, the generation
+    parameters and the token IDs of the chunk, so that reprocessing a document,
+    or a revised version sharing most of its text with an earlier one, only
+    sends the new chunks to the model. Least recently used summaries are evicted
+    to keep the memo under `maxBytes`.
+    """
+
+    def __init__(
+        self,
+        path: Path = IOConsts.SUMMARY_MEMO_PATH,
+        maxBytes: int = IOConsts.SUMMARY_MEMO_MAX_SIZE_MB * 1024**2,
+        verbose: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.maxBytes = maxBytes
+        self.verbose = verbose
+
+        os.makedirs(self.path.parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                lastAccess REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS summariesLastAccess ON summaries (lastAccess);
+            """
+        )
+        self._connection.commit()
+
+    def __del__(self) -> None:
+        """
+        SummaryMemo destructor: when object gets destroyed, close the memo
+        """
+        self._connection.close()
+
+    @staticmethod
+    def getKeys(
+        modelName: str,
+        params: Dict[str, Any],
+        chunks: List[List[int]],
+    ) -> List[str]:
+        """
+        Compute the keys of the summaries of chunks.
+
+        Parameters
+        ----------
+        `modelName` : `str`
+            The name of the model generating the summaries
+        `params` : `Dict[str, Any]`
+            The generation parameters, e.g. minimum and maximum lengths, number
+            of beams and sampling
+        `chunks` : `List[List[int]]`
+            The token IDs of the chunks
+
+        Returns
+        -------
+        `List[str]`
+            The hexadecimal SHA-256 key of each chunk
+        """
+        prefix = hashlib.sha256(
+            json.dumps([modelName, params], sort_keys=True, default=str).encode()
+        )
+
+        keys = []
+        for chunk in chunks:
+            digest = prefix.copy()
+            digest.update(array("q", chunk).tobytes())
+            keys.append(digest.hexdigest())
+
+        return keys
+
+    def get(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Get the memoized summaries of chunks.
+
+        Parameters
+        ----------
+        `keys` : `List[str]`
+            The keys of the chunks, as returned by `getKeys`
+
+        Returns
+        -------
+        `List[Optional[str]]`
+            The summary of each chunk, `None` if it is not memoized
+        """
+        if not keys:
+            return []
+
+        found: Dict[str, str] = {}
+        with self._lock:
+            # Stay under SQLite's limit on the number of query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ", ".join("?" * len(batch))
+                found.update(
+                    self._connection.execute(
+                        f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                )
+                self._connection.execute(
+                    f"UPDATE summaries SET lastAccess = ? WHERE key IN ({placeholders})",
+                    [time.time(), *batch],
+                )
+            self._connection.commit()
+
+        log(
+            f"Summary memo hits: {len(found):,}/{len(keys):,} chunks",
+            level="debug",
+            verbose=self.verbose,
+        )
+
+        return [found.get(key) for key in keys]
+
+    def put(self, keys: List[str], summaries: List[str]) -> None:
+        """
+        Memoize the summaries of chunks, then evict least recently used summaries
+        if the memo is over budget.
+
+        Parameters
+        ----------
+        `keys` : `List[str]`
+            The keys of the chunks, as returned by `getKeys`
+        `summaries` : `List[str]`
+            The summary of each chunk
+        """
+        now = time.time()
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?)",
+                [
+                    (key, summary, len(summary.encode()), now)
+                    for key, summary in zip(keys, summaries)
+                ],
+            )
+            self._connection.commit()
+
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Evict least recently used summaries until the total size of the memo is
+        under `maxBytes`.
+        """
+        with self._lock:
+            totalSize = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM summaries"
+            ).fetchone()[0]
+
+            if totalSize <= self.maxBytes:
+                return
+
+            rows = self._connection.execute(
+                "SELECT key, size FROM summaries ORDER BY lastAccess ASC"
+            ).fetchall()
+
+            evicted = []
+            for key, size in rows:
+                if totalSize <= self.maxBytes:
+                    break
+
+                evicted.append((key,))
+                totalSize -= size
+
+            self._connection.executemany("DELETE FROM summaries WHERE key = ?", evicted)
+            self._connection.commit()
+
+        log(
+            f"Evicted {len(evicted):,} summaries from the summary memo",
+            level="info",
+            verbose=self.verbose,
+        )
@@ -4,15 +4,15 @@ This module contains miscellaneous functions and classes.
 import inspect
 import os
 import sys
-from typing import Any, Dict
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, TypeVar
 
 from loguru import logger
-from transformers.utils import logging as hfLogging
 
 from unml.utils.consts.io import IOConsts
 from unml.utils.consts.logger import LoggerConsts
 
-hfLogging.set_verbosity(40)
+T = TypeVar("T")
 
 
 def getPenultimateFunctionName() -> str:
@@ -114,3 +114,28 @@ def log(
             logFunc = bindedLogger.debug
 
     logFunc(message)
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of `size` items, the last one possibly shorter.
+    Items are only consumed when a batch is requested, so that the iterable can
+    be a stream.
+
+    Parameters
+    ----------
+    `iterable` : `Iterable[T]`
+        The iterable to split
+    `size` : `int`
+        The number of items per batch
+
+    Returns
+    -------
+    `Iterator[List[T]]`
+        The batches
+    """
+    assert size > 0, "size must be strictly positive"
+
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -1,19 +1,45 @@
 import asyncio
+import atexit
+import multiprocessing
 import os
+import queue
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Generator, List, Optional, Tuple
 
-import aiohttp
 from requests import get
 from undl.client import UNDLClient
 
+from unml.utils.cache import DownloadCache
 from unml.utils.consts.io import IOConsts
+from unml.utils.consts.network import NetworkConsts
+from unml.utils.consts.text import TextConsts
+from unml.utils.download import DownloadEngine
 from unml.utils.io import IOUtils
 from unml.utils.misc import log
+from unml.utils.store import TextStore
 from unml.utils.text import TextUtils
 from unml.utils.types.document import Document
 from unml.utils.types.record import Record
 
+# Extraction process pools, by number of workers, shared by all the calls of the
+# process so that workers are only spawned once, e.g. by the API across requests
+_extractionPools: Dict[int, ProcessPoolExecutor] = {}
+_extractionPoolsLock = threading.Lock()
+
+
+@atexit.register
+def _shutdownExtractionPools() -> None:
+    """
+    Stop the workers of the shared extraction process pools on exit.
+    """
+    with _extractionPoolsLock:
+        for pool in _extractionPools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+        _extractionPools.clear()
+
 
 class NetworkUtils:
     """
@@ -61,6 +87,13 @@ class NetworkUtils:
     def extractTextFromDocuments(
         docs: List[Document],
         headers: Optional[Dict[str, Any]] = None,
+        maxConcurrency: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+        maxConcurrencyPerHost: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+        extractionWorkers: int = TextConsts.EXTRACTION_WORKERS,
+        saveToDisk: bool = IOConsts.SAVE_DOWNLOADS,
+        cacheSize: int = IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+        pageRangeThreshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        useTextStore: bool = IOConsts.USE_TEXT_STORE,
         verbose: bool = False,
     ) -> List[Dict[str, str]]:
         """
@@ -73,6 +106,28 @@ class NetworkUtils:
             The list of documents
         `headers` : `Optional[Dict[str, Any]]`, optional
             The headers to pass to the HTTP request, by default `None`
+        `maxConcurrency` : `int`, optional
+            Maximum number of concurrent downloads, by default
+            `MAX_CONCURRENT_DOWNLOADS`
+        `maxConcurrencyPerHost` : `int`, optional
+            Maximum number of concurrent downloads per host, by default
+            `MAX_CONCURRENT_DOWNLOADS_PER_HOST`
+        `extractionWorkers` : `int`, optional
+            Number of worker processes extracting text, by default
+            `EXTRACTION_WORKERS`. If `0`, text is extracted in a thread instead.
+        `saveToDisk` : `bool`, optional
+            Whether to also save the downloaded files to the downloads folder,
+            by default `SAVE_DOWNLOADS`
+        `cacheSize` : `int`, optional
+            Size budget of the download cache, in MB. If `0`, the cache is
+            disabled, by default `DOWNLOAD_CACHE_MAX_SIZE_MB`
+        `pageRangeThreshold` : `int`, optional
+            Minimum number of pages for a PDF file to be split into page ranges
+            extracted in parallel. If `0`, files are never split, by default
+            `PAGE_RANGE_THRESHOLD`
+        `useTextStore` : `bool`, optional
+            Whether to reuse and persist extracted texts in the `TextStore`, by
+            default `USE_TEXT_STORE`
         `verbose` : `bool`, optional
             Controls the verbose, by default `False`
 
@@ -95,6 +150,13 @@ class NetworkUtils:
             NetworkUtils.getExtractedTextFromMultipleURLs(
                 urls=urls,
                 headers=headers,
+                maxConcurrency=maxConcurrency,
+                maxConcurrencyPerHost=maxConcurrencyPerHost,
+                extractionWorkers=extractionWorkers,
+                saveToDisk=saveToDisk,
+                cacheSize=cacheSize,
+                pageRangeThreshold=pageRangeThreshold,
+                useTextStore=useTextStore,
                 verbose=verbose,
             )
         )
@@ -113,66 +175,208 @@ class NetworkUtils:
     @staticmethod
     async def getExtractedTextFromURL(
         url: str,
-        session: aiohttp.ClientSession,
+        engine: DownloadEngine,
         headers: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        saveToDisk: bool = IOConsts.SAVE_DOWNLOADS,
+        pageRangeThreshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        textStore: Optional[TextStore] = None,
         verbose: bool = False,
-    ) -> Dict[str, str | None]:
+    ) -> Dict[str, Any]:
         """
         Wrapper around an async HTTP GET request. The response is then parsed,
-        the text extracted and cleaned.
+        the text extracted and cleaned. Extraction runs in `executor` so that it
+        never blocks the event loop and other downloads keep streaming in.
 
         Parameters
         ----------
         `url` : `str`
             The URL to get
-        `session` : `aiohttp.ClientSession`
-            The `aiohttp` session
+        `engine` : `DownloadEngine`
+            The download engine, holding the pooled `aiohttp` session
         `headers` : `Optional[Dict[str, Any]]`, optional
             Headers to pass to the request, by default `None`
-        `toJson` : `bool`, optional
-            If `True`, the output will be of the form `{"url": "...", "text": "..."}`.
-            By default `False`
+        `executor` : `Optional[Executor]`, optional
+            The executor to extract the text in. If `None`, the default thread
+            pool executor of the event loop is used, by default `None`
+        `saveToDisk` : `bool`, optional
+            Whether to also save the downloaded file to the downloads folder.
+            The text is always extracted from memory, by default `SAVE_DOWNLOADS`
+        `pageRangeThreshold` : `int`, optional
+            Minimum number of pages for a PDF file to be split into page ranges
+            extracted in parallel. If `0`, files are never split, by default
+            `PAGE_RANGE_THRESHOLD`
+        `textStore` : `Optional[TextStore]`, optional
+            The store of extracted texts. If the content of the URL is already
+            in it, its text is not extracted again, and if the content is
+            unchanged since its last download, it is neither downloaded nor read
+            from the download cache, by default `None`
         `verbose` : `bool`, optional
             Controls the verbose, by default `False`
 
         Returns
         -------
-        `Dict[str, str | None] | None`
-            The text content of file corresponding to the URL. `None` if there was an issue
+        `Dict[str, Any]`
+            The text content of file corresponding to the URL, in the form
+            `{"url": "...", "text": "..."}`, with the character offset of each
+            page in `"pageOffsets"` for PDF files split into page ranges.
+            `"text"` is `None` if there was an issue
         """
         try:
-            async with session.get(url=url, headers=headers) as response:
-                resp = await response.read()
+            resp, digest = await engine.fetchWithDigest(
+                url=url,
+                headers=headers,
+                # Unchanged content whose text is stored is not read from the cache
+                isKnown=textStore.has
+                if textStore is not None and not saveToDisk
+                else None,
+            )
 
-                savedFilePath = IOUtils.saveFileToDownloads(
-                    fileName=url.split("/")[-1],
-                    content=resp,
-                )
+            if digest is None:
+                return {"url": url, "text": None}
 
-                if savedFilePath is not None:
-                    extractedText: str = TextUtils.extractTextFromFile(
-                        path=savedFilePath,
-                        verbose=verbose,
-                    )
-                    cleanedText = TextUtils.cleanText(text=extractedText)
-                else:
-                    cleanedText = None
+            fileName = url.split("/")[-1]
+
+            if saveToDisk and resp is not None:
+                IOUtils.saveFileToDownloads(fileName=fileName, content=resp)
+
+            stored = (
+                await asyncio.to_thread(textStore.get, digest)
+                if textStore is not None
+                else None
+            )
+
+            if stored is not None:
+                return {"url": url, **stored}
+
+            if resp is None:
+                # The text was removed from the store in the meantime
+                resp = await engine.fetch(url=url, headers=headers)
+                if resp is None:
+                    return {"url": url, "text": None}
+
+            extracted = await NetworkUtils.extractTextFromContent(
+                content=resp,
+                fileName=fileName,
+                executor=executor,
+                pageRangeThreshold=pageRangeThreshold,
+                verbose=verbose,
+            )
+
+            if textStore is not None:
+                await asyncio.to_thread(textStore.put, digest, **extracted)
 
-                return {"url": url, "text": cleanedText}
+            return {"url": url, **extracted}
 
         except Exception as e:
             log(f"Unable to get url {url} due to {e}.", level="error", verbose=verbose)
 
             return {"url": url, "text": None}
 
+    @staticmethod
+    async def extractTextFromContent(
+        content: bytes,
+        fileName: str,
+        executor: Optional[Executor] = None,
+        pageRangeThreshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        verbose: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Extract and clean the text of a downloaded file in `executor`. PDF files
+        with at least `pageRangeThreshold` pages are split into page ranges
+        extracted in parallel, whose cleaned pages are stitched back together.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the file
+        `fileName` : `str`
+            The name of the file, used to detect its type
+        `executor` : `Optional[Executor]`, optional
+            The executor to extract the text in. If `None`, the default thread
+            pool executor of the event loop is used, by default `None`
+        `pageRangeThreshold` : `int`, optional
+            Minimum number of pages for a PDF file to be split into page ranges
+            extracted in parallel. If `0`, files are never split, by default
+            `PAGE_RANGE_THRESHOLD`
+        `verbose` : `bool`, optional
+            Controls the verbose, by default `False`
+
+        Returns
+        -------
+        `Dict[str, Any]`
+            The `{"text": "...", "pageOffsets": [...]}` object of the file.
+            `"pageOffsets"` is `None` for the files that are not split.
+        """
+        loop = asyncio.get_running_loop()
+
+        if not TextUtils.isPDF(content=content, fileName=fileName):
+            cleanedText: str = await loop.run_in_executor(
+                executor,
+                TextUtils.extractCleanTextFromBytes,
+                content,
+                fileName,
+                verbose,
+            )
+
+            return {"text": cleanedText, "pageOffsets": None}
+
+        # Large PDFs are split into page ranges extracted in parallel. The first
+        # call counts the pages, and extracts either the whole file or the first
+        # range, so that the contents are only sent once to the workers per range
+        text, pageRanges, firstPages = await loop.run_in_executor(
+            executor,
+            TextUtils.extractCleanTextOrPagesFromPDFBytes,
+            content,
+            pageRangeThreshold,
+            verbose,
+        )
+        if text is not None:
+            return {"text": text, "pageOffsets": None}
+
+        log(
+            f"Extracting {fileName} in {len(pageRanges):,} page ranges",
+            level="info",
+            verbose=verbose,
+        )
+        rangesPages = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    executor,
+                    TextUtils.extractCleanPagesFromPDFBytes,
+                    content,
+                    start,
+                    end,
+                    verbose,
+                )
+                for start, end in pageRanges[1:]
+            ]
+        )
+        cleanedText, pageOffsets = TextUtils.stitchPages(
+            pages=firstPages + [page for pages in rangesPages for page in pages]
+        )
+
+        return {"text": cleanedText, "pageOffsets": pageOffsets}
+
     @staticmethod
     async def getExtractedTextFromMultipleURLs(
         urls: List[str],
         headers: Optional[Dict[str, Any]] = None,
+        maxConcurrency: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+        maxConcurrencyPerHost: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+        extractionWorkers: int = TextConsts.EXTRACTION_WORKERS,
+        saveToDisk: bool = IOConsts.SAVE_DOWNLOADS,
+        cacheSize: int = IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+        pageRangeThreshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        useTextStore: bool = IOConsts.USE_TEXT_STORE,
         verbose: bool = False,
     ) -> List[Dict[str, str]]:
         """
-        Helper function to download multiple URLs asynchronously.
+        Helper function to download multiple URLs asynchronously. Downloads go
+        through a single `DownloadEngine`, which bounds the number of concurrent
+        connections globally and per host and retries transient failures.
+        Text extraction is offloaded to a pool of worker processes, so that
+        parsing overlaps with the downloads still in flight.
 
         Parameters
         ----------
@@ -180,6 +384,28 @@ class NetworkUtils:
             List of URLs to download
         `headers` : `Optional[Dict[str, Any]]`, optional
             Headers to pass to the request, by default `None`
+        `maxConcurrency` : `int`, optional
+            Maximum number of concurrent downloads, by default
+            `MAX_CONCURRENT_DOWNLOADS`
+        `maxConcurrencyPerHost` : `int`, optional
+            Maximum number of concurrent downloads per host, by default
+            `MAX_CONCURRENT_DOWNLOADS_PER_HOST`
+        `extractionWorkers` : `int`, optional
+            Number of worker processes extracting text, by default
+            `EXTRACTION_WORKERS`. If `0`, text is extracted in a thread instead.
+        `saveToDisk` : `bool`, optional
+            Whether to also save the downloaded files to the downloads folder,
+            by default `SAVE_DOWNLOADS`
+        `cacheSize` : `int`, optional
+            Size budget of the download cache, in MB. If `0`, the cache is
+            disabled, by default `DOWNLOAD_CACHE_MAX_SIZE_MB`
+        `pageRangeThreshold` : `int`, optional
+            Minimum number of pages for a PDF file to be split into page ranges
+            extracted in parallel. If `0`, files are never split, by default
+            `PAGE_RANGE_THRESHOLD`
+        `useTextStore` : `bool`, optional
+            Whether to reuse and persist extracted texts in the `TextStore`, by
+            default `USE_TEXT_STORE`
         `verbose` : `bool`, optional
             Verbose argument, by default `False`
 
@@ -191,17 +417,33 @@ class NetworkUtils:
         """
 
         log(f"Now downloading {len(urls):,} urls...", level="info", verbose=verbose)
-        async with aiohttp.ClientSession() as session:
-            ret = await asyncio.gather(
-                *[
-                    NetworkUtils.getExtractedTextFromURL(
-                        url=url,
-                        session=session,
-                        headers=headers,
-                    )
-                    for url in urls
-                ]
-            )
+        textStore = TextStore(verbose=verbose) if useTextStore else None
+        with NetworkUtils.getExtractionExecutor(
+            extractionWorkers=extractionWorkers
+        ) as pool:
+            async with DownloadEngine(
+                maxConcurrency=maxConcurrency,
+                maxConcurrencyPerHost=maxConcurrencyPerHost,
+                cache=NetworkUtils.getDownloadCache(
+                    cacheSize=cacheSize,
+                    verbose=verbose,
+                ),
+                verbose=verbose,
+            ) as engine:
+                ret = await asyncio.gather(
+                    *[
+                        NetworkUtils.getExtractedTextFromURL(
+                            url=url,
+                            engine=engine,
+                            headers=headers,
+                            executor=pool,
+                            saveToDisk=saveToDisk,
+                            pageRangeThreshold=pageRangeThreshold,
+                            textStore=textStore,
+                        )
+                        for url in urls
+                    ]
+                )
 
         log(
             f"Finalized all. Return is a list of len {len(ret):,} outputs.",
@@ -211,7 +453,301 @@ class NetworkUtils:
         return ret
 
     @staticmethod
-    def queryByIdUNDL(record: Record) -> Optional[Document]:
+    def getExtractionExecutor(
+        extractionWorkers: int = TextConsts.EXTRACTION_WORKERS,
+    ) -> ContextManager[Optional[Executor]]:
+        """
+        Get the executor in which downloaded files are parsed. Process pools are
+        created on the first call and shared by the next ones, so that their
+        workers are only spawned once per process. They are stopped on exit.
+
+        Parameters
+        ----------
+        `extractionWorkers` : `int`, optional
+            Number of worker processes extracting text, by default
+            `EXTRACTION_WORKERS`
+
+        Returns
+        -------
+        `ContextManager[Optional[Executor]]`
+            A context yielding the shared process pool if `extractionWorkers` is
+            strictly positive, otherwise `None`, i.e. the default thread pool of
+            the loop. Exiting the context does not stop the pool
+        """
+        if extractionWorkers <= 0:
+            return nullcontext()
+
+        with _extractionPoolsLock:
+            pool = _extractionPools.get(extractionWorkers)
+
+            # A pool whose worker died cannot run anything anymore: replace it
+            if pool is None or pool._broken:  # type: ignore
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(
+                    max_workers=extractionWorkers,
+                    mp_context=multiprocessing.get_context(
+                        TextConsts.EXTRACTION_START_METHOD
+                    ),
+                )
+                _extractionPools[extractionWorkers] = pool
+
+        return nullcontext(pool)
+
+    @staticmethod
+    def getDownloadCache(
+        cacheSize: int = IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+        verbose: bool = False,
+    ) -> Optional[DownloadCache]:
+        """
+        Get the download cache for a given size budget.
+
+        Parameters
+        ----------
+        `cacheSize` : `int`, optional
+            Size budget of the download cache, in MB, by default
+            `DOWNLOAD_CACHE_MAX_SIZE_MB`
+        `verbose` : `bool`, optional
+            Verbose argument, by default `False`
+
+        Returns
+        -------
+        `Optional[DownloadCache]`
+            The download cache, `None` if `cacheSize` is `0`
+        """
+        if cacheSize > 0:
+            return DownloadCache(maxBytes=cacheSize * 1024**2, verbose=verbose)
+
+        return None
+
+    @staticmethod
+    def streamTextFromDocuments(
+        docs: List[Document],
+        headers: Optional[Dict[str, Any]] = None,
+        prefetch: int = NetworkConsts.PREFETCH_DEPTH,
+        maxBatchSize: int = 1,
+        maxConcurrency: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS,
+        maxConcurrencyPerHost: int = NetworkConsts.MAX_CONCURRENT_DOWNLOADS_PER_HOST,
+        extractionWorkers: int = TextConsts.EXTRACTION_WORKERS,
+        saveToDisk: bool = IOConsts.SAVE_DOWNLOADS,
+        cacheSize: int = IOConsts.DOWNLOAD_CACHE_MAX_SIZE_MB,
+        pageRangeThreshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        useTextStore: bool = IOConsts.USE_TEXT_STORE,
+        verbose: bool = False,
+    ) -> Generator[List[Tuple[Document, Dict[str, str | None]]], None, None]:
+        """
+        Streaming counterpart of `extractTextFromDocuments`: documents are
+        downloaded and parsed in a background thread and yielded as soon as their
+        text is ready, in completion order. At most `prefetch` documents are in
+        flight and at most `prefetch` extracted documents wait to be consumed, so
+        memory stays bounded whatever the size of the batch.
+
+        Documents are yielded in batches of the ones already waiting, up to
+        `maxBatchSize`: a batch is never held back until it is full, so that
+        documents flow through the pipeline as soon as they are ready.
+
+        Parameters
+        ----------
+        `docs` : `List[Document]`
+            The list of documents
+        `headers` : `Optional[Dict[str, Any]]`, optional
+            The headers to pass to the HTTP request, by default `None`
+        `prefetch` : `int`, optional
+            Prefetch depth, by default `PREFETCH_DEPTH`
+        `maxBatchSize` : `int`, optional
+            Maximum number of documents per batch, by default `1`
+        `maxConcurrency` : `int`, optional
+            Maximum number of concurrent downloads, by default
+            `MAX_CONCURRENT_DOWNLOADS`
+        `maxConcurrencyPerHost` : `int`, optional
+            Maximum number of concurrent downloads per host, by default
+            `MAX_CONCURRENT_DOWNLOADS_PER_HOST`
+        `extractionWorkers` : `int`, optional
+            Number of worker processes extracting text, by default
+            `EXTRACTION_WORKERS`. If `0`, text is extracted in a thread instead.
+        `saveToDisk` : `bool`, optional
+            Whether to also save the downloaded files to the downloads folder,
+            by default `SAVE_DOWNLOADS`
+        `cacheSize` : `int`, optional
+            Size budget of the download cache, in MB. If `0`, the cache is
+            disabled, by default `DOWNLOAD_CACHE_MAX_SIZE_MB`
+        `pageRangeThreshold` : `int`, optional
+            Minimum number of pages for a PDF file to be split into page ranges
+            extracted in parallel. If `0`, files are never split, by default
+            `PAGE_RANGE_THRESHOLD`
+        `useTextStore` : `bool`, optional
+            Whether to reuse and persist extracted texts in the `TextStore`, by
+            default `USE_TEXT_STORE`
+        `verbose` : `bool`, optional
+            Controls the verbose, by default `False`
+
+        Yields
+        ------
+        `List[Tuple[Document, Dict[str, str | None]]]`
+            Batches of documents with their `{"url": "...", "text": "..."}` object
+        """
+        assert prefetch > 0, "prefetch must be strictly positive"
+        assert maxBatchSize > 0, "maxBatchSize must be strictly positive"
+
+        outQueue: queue.Queue[Any] = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def produce() -> None:
+            """
+            Run the download and extraction stage, then signal its end.
+            """
+            try:
+                asyncio.run(
+                    NetworkUtils._produceExtractedText(
+                        docs=docs,
+                        outQueue=outQueue,
+                        stop=stop,
+                        headers=headers,
+                        prefetch=prefetch,
+                        maxConcurrency=maxConcurrency,
+                        maxConcurrencyPerHost=maxConcurrencyPerHost,
+                        extractionWorkers=extractionWorkers,
+                        saveToDisk=saveToDisk,
+                        cacheSize=cacheSize,
+                        pageRangeThreshold=pageRangeThreshold,
+                        useTextStore=useTextStore,
+                        verbose=verbose,
+                    )
+                )
+                outQueue.put(done)
+            except BaseException as e:
+                outQueue.put(e)
+
+        producer = threading.Thread(target=produce, name="unml-download")
+        producer.start()
+
+        try:
+            finished = False
+            while not finished:
+                # Only wait for the first document of a batch: the others are
+                # the ones already waiting
+                batch: List[Tuple[Document, Dict[str, str | None]]] = []
+                item = outQueue.get()
+                while True:
+                    if item is done:
+                        finished = True
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+
+                    batch.append(item)
+                    if len(batch) == maxBatchSize:
+                        break
+
+                    try:
+                        item = outQueue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    yield batch
+        finally:
+            # If the consumer failed or stopped early, the producer is stopped and
+            # the queue drained until it exits, so that it never stays blocked on
+            # a full queue with its session and extraction pool open
+            stop.set()
+            while producer.is_alive():
+                try:
+                    outQueue.get(timeout=NetworkConsts.STOP_POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+            producer.join()
+
+    @staticmethod
+    async def _produceExtractedText(
+        docs: List[Document],
+        outQueue: "queue.Queue[Any]",
+        stop: threading.Event,
+        headers: Optional[Dict[str, Any]],
+        prefetch: int,
+        maxConcurrency: int,
+        maxConcurrencyPerHost: int,
+        extractionWorkers: int,
+        saveToDisk: bool,
+        cacheSize: int,
+        pageRangeThreshold: int,
+        useTextStore: bool,
+        verbose: bool,
+    ) -> None:
+        """
+        Download and extract documents with at most `prefetch` of them in flight,
+        pushing each result to `outQueue` as soon as it is ready. Pushing blocks
+        while the queue is full, which stops new downloads from being started.
+        Downloads in flight are cancelled as soon as `stop` is set.
+
+        See `streamTextFromDocuments` for the parameters.
+        """
+        textStore = TextStore(verbose=verbose) if useTextStore else None
+
+        with NetworkUtils.getExtractionExecutor(
+            extractionWorkers=extractionWorkers
+        ) as pool:
+            async with DownloadEngine(
+                maxConcurrency=maxConcurrency,
+                maxConcurrencyPerHost=maxConcurrencyPerHost,
+                cache=NetworkUtils.getDownloadCache(
+                    cacheSize=cacheSize,
+                    verbose=verbose,
+                ),
+                verbose=verbose,
+            ) as engine:
+                pending: Dict["asyncio.Task[Dict[str, str | None]]", Document] = {}
+                remaining = iter(docs)
+                exhausted = False
+
+                while not stop.is_set():
+                    while (
+                        not exhausted and len(pending) < prefetch and not stop.is_set()
+                    ):
+                        doc = next(remaining, None)
+                        if doc is None:
+                            exhausted = True
+                        elif not doc.url:
+                            await asyncio.to_thread(
+                                outQueue.put, (doc, {"url": None, "text": None})
+                            )
+                        else:
+                            task = asyncio.create_task(
+                                NetworkUtils.getExtractedTextFromURL(
+                                    url=doc.url,
+                                    engine=engine,
+                                    headers=headers,
+                                    executor=pool,
+                                    saveToDisk=saveToDisk,
+                                    pageRangeThreshold=pageRangeThreshold,
+                                    textStore=textStore,
+                                    verbose=verbose,
+                                )
+                            )
+                            pending[task] = doc
+
+                    if not pending:
+                        break
+
+                    finished, _ = await asyncio.wait(
+                        pending,
+                        timeout=NetworkConsts.STOP_POLL_INTERVAL,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for task in finished:
+                        doc = pending.pop(task)
+                        await asyncio.to_thread(outQueue.put, (doc, task.result()))
+
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    def queryByIdUNDL(
+        record: Record,
+        client: Optional[UNDLClient] = None,
+    ) -> Optional[Document]:
         """
         Query the UNDL API with a given record ID.
 
@@ -219,13 +755,16 @@ class NetworkUtils:
         ----------
         `record` : `Record`
             The record to query the API with
+        `client` : `Optional[UNDLClient]`, optional
+            The client to query the API with. If `None`, a new client is
+            created, by default `None`
 
         Returns
         -------
         `Optional[Document]`
             The document corresponding to the record ID, `None` if not found or doesn't contain the right structure.
         """
-        clientUNDL = UNDLClient(verbose=True)
+        clientUNDL = client if client is not None else UNDLClient(verbose=True)
 
         queryResult = clientUNDL.queryById(recordId=record.recordId)
 
@@ -246,3 +785,75 @@ class NetworkUtils:
         )
 
         return doc
+
+    @staticmethod
+    def queryByIdsUNDL(
+        records: List[Record],
+        client: Optional[UNDLClient] = None,
+        maxConcurrency: int = NetworkConsts.MAX_CONCURRENT_METADATA_QUERIES,
+        verbose: bool = False,
+    ) -> List[Optional[Document]]:
+        """
+        Query the UNDL API for a batch of record IDs. Lookups run concurrently in a
+        bounded thread pool and all go through the same client, instead of
+        creating one client per record.
+
+        The client can be pointed to a local stand-in of the UNDL API, either by
+        passing any object exposing `queryById(recordId=...)` or through the
+        `UN_API` environment variable read by `UNDLClient`.
+
+        Parameters
+        ----------
+        `records` : `List[Record]`
+            The records to query the API with
+        `client` : `Optional[UNDLClient]`, optional
+            The client shared by all lookups. If `None`, a new client is
+            created, by default `None`
+        `maxConcurrency` : `int`, optional
+            Maximum number of concurrent lookups, by default
+            `MAX_CONCURRENT_METADATA_QUERIES`
+        `verbose` : `bool`, optional
+            Controls the verbose, by default `False`
+
+        Returns
+        -------
+        `List[Optional[Document]]`
+            The documents corresponding to the records, in the same order as
+            `records`. `None` for records not found.
+
+        Raises
+        ------
+        `RuntimeError`
+            If a lookup fails, with the ID of the corresponding record
+        """
+        clientUNDL = client if client is not None else UNDLClient(verbose=verbose)
+
+        def query(record: Record) -> Optional[Document]:
+            """
+            Query a single record with the shared client.
+            """
+            try:
+                return NetworkUtils.queryByIdUNDL(record=record, client=clientUNDL)
+            except Exception as e:
+                raise RuntimeError(f"{e} at record {record.recordId}") from e
+
+        log(
+            f"Querying UNDL for {len(records):,} records...",
+            level="info",
+            verbose=verbose,
+        )
+        start = time.time()
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(maxConcurrency, len(records))),
+            thread_name_prefix="unml-undl",
+        ) as pool:
+            docs = list(pool.map(query, records))
+
+        log(
+            f"Took {time.time() - start:.2f} seconds to query {len(records):,} records!",
+            level="success",
+            verbose=verbose,
+        )
+
+        return docs
@@ -0,0 +1,153 @@
+"""
+This module contains the `StageExecutor` class, running the stages of the pipeline
+concurrently.
+"""
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Callable, List, Optional, Type, TypeVar
+
+from unml.utils.misc import log
+
+T = TypeVar("T")
+
+
+def setTorchThreads(nThreads: int) -> None:
+    """
+    Set the number of intra-op threads of `torch`. This setting is global to the
+    process: it is shared by all the threads, and thus by all the stages.
+
+    Parameters
+    ----------
+    `nThreads` : `int`
+        The number of threads. `0`, or `torch` not being loaded, leaves the
+        default unchanged
+    """
+    if nThreads <= 0 or "torch" not in sys.modules:
+        return
+
+    import torch
+
+    torch.set_num_threads(nThreads)
+
+
+class StageExecutor:
+    """
+    Executor running each stage of the pipeline, e.g. summarization and NER, in a
+    dedicated thread.
+
+    Stages only share the extracted texts, so that running them concurrently
+    brings the latency of a batch of documents close to the one of its slowest
+    stage. Threads, rather than processes, let the stages use the models already
+    loaded, e.g. the ones kept by the API across requests, without copying them.
+    As the number of `torch` threads is global to the process, the stages share
+    the one set by `setTorchThreads`, see `getTorchThreads`.
+    """
+
+    def __init__(self, stages: List[str], verbose: bool = False) -> None:
+        """
+        Start the thread of each stage.
+
+        Parameters
+        ----------
+        `stages` : `List[str]`
+            The names of the enabled stages
+        `verbose` : `bool`, optional
+            Verbose argument, by default False
+        """
+        self.stages = stages
+        self._pools = {
+            stage: ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"unml-{stage}",
+            )
+            for stage in stages
+        }
+
+        log(
+            f"Stages started: {', '.join(stages)}",
+            level="debug",
+            verbose=verbose,
+        )
+
+    def __enter__(self) -> "StageExecutor":
+        """
+        Use the executor as a context manager, stopping its threads on exit.
+
+        Returns
+        -------
+        `StageExecutor`
+            The executor itself
+        """
+        return self
+
+    def __exit__(
+        self,
+        excType: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """
+        Stop the threads of the stages.
+        """
+        self.shutdown()
+
+    @staticmethod
+    def getTorchThreads(stages: List[str], nThreads: int = 0) -> int:
+        """
+        Get the number of `torch` threads for stages running concurrently.
+
+        Parameters
+        ----------
+        `stages` : `List[str]`
+            The names of the enabled stages
+        `nThreads` : `int`, optional
+            The number of threads set explicitly. If `0`, the CPU cores are split
+            evenly between the stages, so that their concurrent operations do not
+            oversubscribe them, by default `0`
+
+        Returns
+        -------
+        `int`
+            The number of threads
+        """
+        if nThreads > 0:
+            return nThreads
+
+        return max(1, (os.cpu_count() or 1) // max(1, len(stages)))
+
+    def submit(
+        self,
+        stage: str,
+        function: Callable[..., T],
+        *args: Any,
+        **kwargs: Any,
+    ) -> "Future[T]":
+        """
+        Run a function in the thread of a stage.
+
+        Parameters
+        ----------
+        `stage` : `str`
+            The name of the stage
+        `function` : `Callable[..., T]`
+            The function to run
+        `*args` : `Any`
+            The positional arguments of the function
+        `**kwargs` : `Any`
+            The keyword arguments of the function
+
+        Returns
+        -------
+        `Future[T]`
+            The future result of the function
+        """
+        return self._pools[stage].submit(function, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        """
+        Wait for the running stages, then stop their threads.
+        """
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
@@ -0,0 +1,147 @@
+"""
+This module contains the `TextStore` class, a persistent store of extracted texts.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from unml.utils.consts.io import IOConsts
+from unml.utils.consts.text import TextConsts
+from unml.utils.misc import log
+
+
+class TextStore:
+    """
+    Persistent store of the cleaned text extracted from documents, in a single
+    SQLite file keyed by the SHA-256 digest of the document's content.
+
+    Re-running the pipeline on known content, e.g. to compare summarizers or
+    recognizers, skips the extraction entirely. Entries written by a different
+    `EXTRACTION_VERSION` are ignored, so that changes to the extraction or
+    cleaning logic never serve stale text.
+    """
+
+    def __init__(
+        self,
+        path: Path = IOConsts.TEXT_STORE_PATH,
+        verbose: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.verbose = verbose
+
+        os.makedirs(self.path.parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=30,
+            check_same_thread=False,
+        )
+        # Let several pipelines read the store while one of them writes to it
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS texts (
+                hash TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                pageOffsets TEXT,
+                createdAt REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def __del__(self) -> None:
+        """
+        TextStore destructor: when object gets destroyed, close the store
+        """
+        self._connection.close()
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the extracted text of a content.
+
+        Parameters
+        ----------
+        `digest` : `str`
+            The SHA-256 digest of the content
+
+        Returns
+        -------
+        `Optional[Dict[str, Any]]`
+            The `{"text": "...", "pageOffsets": [...]}` object of the content,
+            `None` if it is not in the store
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT text, pageOffsets FROM texts WHERE hash = ? AND version = ?",
+                (digest, TextConsts.EXTRACTION_VERSION),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        log(f"Text store hit for {digest[:12]}", level="debug", verbose=self.verbose)
+
+        return {
+            "text": row[0],
+            "pageOffsets": json.loads(row[1]) if row[1] is not None else None,
+        }
+
+    def has(self, digest: str) -> bool:
+        """
+        Check whether the extracted text of a content is in the store.
+
+        Parameters
+        ----------
+        `digest` : `str`
+            The SHA-256 digest of the content
+
+        Returns
+        -------
+        `bool`
+            Whether the text is in the store
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM texts WHERE hash = ? AND version = ?",
+                (digest, TextConsts.EXTRACTION_VERSION),
+            ).fetchone()
+
+        return row is not None
+
+    def put(
+        self,
+        digest: str,
+        text: str,
+        pageOffsets: Optional[List[int]] = None,
+    ) -> None:
+        """
+        Store the extracted text of a content.
+
+        Parameters
+        ----------
+        `digest` : `str`
+            The SHA-256 digest of the content
+        `text` : `str`
+            The cleaned text extracted from the content
+        `pageOffsets` : `Optional[List[int]]`, optional
+            The character offset of each page in the text, by default `None`
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO texts VALUES (?, ?, ?, ?, ?)",
+                (
+                    digest,
+                    TextConsts.EXTRACTION_VERSION,
+                    text,
+                    json.dumps(pageOffsets) if pageOffsets is not None else None,
+                    time.time(),
+                ),
+            )
+            self._connection.commit()
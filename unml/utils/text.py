@@ -1,13 +1,19 @@
 import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import fitz
-from transformers import PreTrainedTokenizer
 
-from unml.utils.consts.countries import COUNTRIES
-from unml.utils.consts.un_bodies import UN_BODIES
+from unml.utils.consts.countries import COUNTRIES, COUNTRY_ALIASES
+from unml.utils.consts.ner import NERConsts
+from unml.utils.consts.text import TextConsts
+from unml.utils.consts.un_bodies import UN_BODIES, UN_BODY_ALIASES
+from unml.utils.gazetteer import Gazetteer
 from unml.utils.misc import log
 
+if TYPE_CHECKING:
+    from transformers import PreTrainedTokenizerFast
+
 
 class TextUtils:
     """
@@ -41,6 +47,247 @@ class TextUtils:
 
         return extractedText
 
+    @staticmethod
+    def extractTextFromPDFBytes(content: bytes, verbose: bool = False) -> str:
+        """
+        Extract text from the raw bytes of a PDF file, without writing it to disk.
+        `fitz` keeps a reference to the `bytes` object instead of copying it.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the PDF file
+        `verbose` : `bool`
+            The verbose argument. Defaults to `False`.
+
+        Returns
+        -------
+        `str`
+            The text from the PDF file
+        """
+        log(
+            f"Extracting text from in-memory PDF ({len(content):,} bytes)...",
+            level="info",
+            verbose=verbose,
+        )
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            text = [page.get_text() for page in doc]
+
+        return "\n".join(text)
+
+    @staticmethod
+    def isPDF(content: bytes, fileName: str) -> bool:
+        """
+        Check if the raw bytes of a file are a PDF file.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the file
+        `fileName` : `str`
+            The name of the file
+
+        Returns
+        -------
+        `bool`
+            `True` if the file is a PDF file, `False` otherwise
+        """
+        return fileName.lower().endswith(".pdf") or content.startswith(b"%PDF")
+
+    @staticmethod
+    def extractCleanTextOrPagesFromPDFBytes(
+        content: bytes,
+        threshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        verbose: bool = False,
+    ) -> Tuple[Optional[str], List[Tuple[int, int]], List[str]]:
+        """
+        Extract and clean the text of a PDF file in a single pass, as
+        `extractCleanTextFromBytes` does, unless it is large enough to be split
+        into page ranges, see `getPageRanges`. The file is only opened once, both
+        to count its pages and to extract them. This is the unit of work sent to
+        the extraction worker processes, so it must stay picklable.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the PDF file
+        `threshold` : `int`, optional
+            Minimum number of pages for the file to be split. If `0`, the file is
+            never split, by default `PAGE_RANGE_THRESHOLD`
+        `verbose` : `bool`
+            The verbose argument. Defaults to `False`.
+
+        Returns
+        -------
+        `Tuple[Optional[str], List[Tuple[int, int]], List[str]]`
+            The cleaned text of the file, `None` if it is split. Then, the page
+            ranges of the file and the cleaned text of each page of the first
+            one, empty if it is not split
+        """
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            pageRanges = TextUtils.getPageRanges(
+                pageCount=doc.page_count,
+                threshold=threshold,
+            )
+
+            if len(pageRanges) == 1:
+                log(
+                    f"Extracting text from in-memory PDF ({len(content):,} bytes)...",
+                    level="info",
+                    verbose=verbose,
+                )
+                text = "\n".join(page.get_text() for page in doc)
+
+                return TextUtils.cleanText(text=text), pageRanges, []
+
+            start, end = pageRanges[0]
+            log(
+                f"Extracting text from pages {start}-{end - 1} of in-memory PDF...",
+                level="info",
+                verbose=verbose,
+            )
+
+            return (
+                None,
+                pageRanges,
+                [
+                    TextUtils.cleanText(text=doc[i].get_text())
+                    for i in range(start, end)
+                ],
+            )
+
+    @staticmethod
+    def getPageRanges(
+        pageCount: int,
+        threshold: int = TextConsts.PAGE_RANGE_THRESHOLD,
+        pagesPerRange: int = TextConsts.PAGES_PER_RANGE,
+    ) -> List[Tuple[int, int]]:
+        """
+        Split the pages of a PDF file into ranges to be extracted in parallel.
+
+        Parameters
+        ----------
+        `pageCount` : `int`
+            The number of pages of the PDF file
+        `threshold` : `int`, optional
+            Minimum number of pages for the file to be split. If `0`, the file is
+            never split, by default `PAGE_RANGE_THRESHOLD`
+        `pagesPerRange` : `int`, optional
+            Number of pages per range, by default `PAGES_PER_RANGE`
+
+        Returns
+        -------
+        `List[Tuple[int, int]]`
+            The `(start, end)` page ranges, `end` excluded
+        """
+        if threshold <= 0 or pageCount < threshold:
+            return [(0, pageCount)]
+
+        return [
+            (start, min(start + pagesPerRange, pageCount))
+            for start in range(0, pageCount, pagesPerRange)
+        ]
+
+    @staticmethod
+    def extractCleanPagesFromPDFBytes(
+        content: bytes,
+        start: int = 0,
+        end: Optional[int] = None,
+        verbose: bool = False,
+    ) -> List[str]:
+        """
+        Extract and clean the text of a range of pages of a PDF file. This is the
+        unit of work sent to the extraction worker processes, so it must stay
+        picklable.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the PDF file
+        `start` : `int`, optional
+            The first page of the range, by default `0`
+        `end` : `Optional[int]`, optional
+            The page after the last page of the range. If `None`, the range ends
+            at the last page, by default `None`
+        `verbose` : `bool`
+            The verbose argument. Defaults to `False`.
+
+        Returns
+        -------
+        `List[str]`
+            The cleaned text of each page of the range
+        """
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            end = doc.page_count if end is None else end
+            log(
+                f"Extracting text from pages {start}-{end - 1} of in-memory PDF...",
+                level="info",
+                verbose=verbose,
+            )
+
+            return [
+                TextUtils.cleanText(text=doc[i].get_text()) for i in range(start, end)
+            ]
+
+    @staticmethod
+    def stitchPages(pages: List[str]) -> Tuple[str, List[int]]:
+        """
+        Stitch the cleaned text of the pages of a document back together.
+
+        Parameters
+        ----------
+        `pages` : `List[str]`
+            The cleaned text of each page, in order
+
+        Returns
+        -------
+        `Tuple[str, List[int]]`
+            The text of the document and the character offset at which each page
+            starts in it
+        """
+        offsets = []
+        nonEmptyPages = []
+        offset = 0
+
+        for page in pages:
+            offsets.append(offset)
+            if page:
+                nonEmptyPages.append(page)
+                offset += len(page) + 1
+
+        text = " ".join(nonEmptyPages)
+
+        # Trailing empty pages start at the end of the text
+        return text, [min(offset, len(text)) for offset in offsets]
+
+    @staticmethod
+    def extractTextFromBytes(
+        content: bytes,
+        fileName: str,
+        verbose: bool = False,
+    ) -> str:
+        """
+        Extract text from the raw bytes of a file.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the file
+        `fileName` : `str`
+            The name of the file, used to detect its type
+        `verbose` : `bool`
+            The verbose argument. Defaults to `False`.
+
+        Returns
+        -------
+        `str`
+            The text from the file
+        """
+        if TextUtils.isPDF(content=content, fileName=fileName):
+            return TextUtils.extractTextFromPDFBytes(content=content, verbose=verbose)
+
+        return content.decode("utf-8", errors="replace")
+
     @staticmethod
     def extractTextFromFile(path: str, verbose: bool = False) -> str:
         """
@@ -68,6 +315,39 @@ class TextUtils:
 
         return text
 
+    @staticmethod
+    def extractCleanTextFromBytes(
+        content: bytes,
+        fileName: str,
+        verbose: bool = False,
+    ) -> str:
+        """
+        Extract text from the raw bytes of a file and clean it. This is the unit
+        of work sent to the extraction worker processes, so it must stay
+        picklable.
+
+        Parameters
+        ----------
+        `content` : `bytes`
+            The contents of the file
+        `fileName` : `str`
+            The name of the file, used to detect its type
+        `verbose` : `bool`
+            The verbose argument. Defaults to `False`.
+
+        Returns
+        -------
+        `str`
+            The cleaned text from the file
+        """
+        extractedText = TextUtils.extractTextFromBytes(
+            content=content,
+            fileName=fileName,
+            verbose=verbose,
+        )
+
+        return TextUtils.cleanText(text=extractedText)
+
     @staticmethod
     def cleanText(text: str) -> str:
         """
@@ -118,75 +398,157 @@ class TextUtils:
         return token in {".", "!", "?"}
 
     @staticmethod
-    def isSentenceValid(sentence: List[str]) -> bool:
+    def encodeWithOffsets(
+        text: str,
+        tokenizer: "PreTrainedTokenizerFast",
+    ) -> Tuple[List[int], List[Tuple[int, int]]]:
         """
-        Check if a sentence is valid or not
+        Tokenize a text once into token IDs and their character offsets.
 
         Parameters
         ----------
-        `sentence` : `List[str]`
-            The sentence to be checked
+        `text` : `str`
+            The text to be tokenized
+        `tokenizer` : `PreTrainedTokenizerFast`
+            The fast tokenizer of the model
 
         Returns
         -------
-        `bool`
-            True if the sentence is valid, False otherwise
+        `Tuple[List[int], List[Tuple[int, int]]]`
+            The token IDs, without special tokens, and the `(start, end)`
+            character span of each token in the text
         """
-        if len(sentence) <= 1:
-            return False
-
-        return True
+        encoding = tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            # Long documents are chunked afterwards: do not warn about their length
+            verbose=False,
+        )
+
+        return encoding["input_ids"], [
+            tuple(span) for span in encoding["offset_mapping"]
+        ]
 
     @staticmethod
-    def chunkTokens(
-        tokens: List[str],
-        tokenizer: PreTrainedTokenizer,
-    ) -> List[str]:
+    def chunkInputIds(
+        inputIds: List[int],
+        offsets: List[Tuple[int, int]],
+        text: str,
+        maxChunkSize: int,
+        stride: int = 0,
+    ) -> List[Dict[str, Any]]:
         """
-        Chunk a list of tokens into smaller chunks.
+        Chunk a sequence of token IDs into chunks of at most `maxChunkSize` tokens.
+        Chunks end on the last end of sentence that fits in them, or are cut at
+        `maxChunkSize` tokens if there is none.
 
         Parameters
         ----------
-        `tokens` : `List[str]`
-            Full list of tokens to be chunked into multiple smaller chunks
-        `tokenizer` : `PreTrainedTokenizer`
-            The tokenizer to be used
+        `inputIds` : `List[int]`
+            The token IDs of the text, as returned by `encodeWithOffsets`
+        `offsets` : `List[Tuple[int, int]]`
+            The character span of each token in the text
+        `text` : `str`
+            The tokenized text
+        `maxChunkSize` : `int`
+            The maximum number of tokens of a chunk
+        `stride` : `int`, optional
+            The number of tokens shared by two consecutive chunks, by default `0`
 
         Returns
         -------
-        `List[str]`
-            List of chunks
-        """
-        chunks: List[str] = []
-        currentChunk: List[str] = []
-        currentSentence: List[str] = []
-
-        maxChunkSize = tokenizer.model_max_length - 10
-
-        for token in tokens:
-            currentSentence += [token]
-            isLast = token == tokens[-1]
-
-            # If the token is the end of a sentence or the last token
-            if TextUtils.isEndOfSentence(token) or isLast:
-                # If the current chunk is not full, add the current sentence to it
-                if len(currentChunk) + len(currentSentence) <= maxChunkSize:
-                    if TextUtils.isSentenceValid(currentSentence):
-                        currentChunk.extend(currentSentence)
-                    currentSentence = []
-                # Otherwise, save the chunk and start a new one with the current sentence
-                else:
-                    decodedChunk = tokenizer.convert_tokens_to_string(currentChunk)
-                    chunks.append(decodedChunk)
-                    currentChunk = currentSentence.copy()
-                    currentSentence = []
-
-        # For the last chunk, add it to the list of chunks
-        decodedChunk = tokenizer.convert_tokens_to_string(currentChunk)
-        chunks.append(decodedChunk)
+        `List[Dict[str, Any]]`
+            The chunks, each as a `{"inputIds", "tokenStart", "tokenEnd", "start",
+            "end"}` object, where `tokenStart`/`tokenEnd` delimit the chunk in
+            `inputIds` and `start`/`end` delimit it in `text`
+        """
+        assert maxChunkSize > 0, "maxChunkSize must be strictly positive"
+        assert 0 <= stride < maxChunkSize, "stride must be in [0, maxChunkSize)"
+
+        chunks: List[Dict[str, Any]] = []
+        nTokens = len(inputIds)
+        start = previousEnd = 0
+
+        while start < nTokens:
+            end = min(start + maxChunkSize, nTokens)
+
+            # Cut the chunk after the last end of sentence it contains, if any.
+            # With a stride, the chunk still has to go past the previous one
+            if end < nTokens:
+                for i in range(end - 1, max(start + 1, previousEnd) - 1, -1):
+                    tokenEnd = offsets[i][1]
+                    if tokenEnd > 0 and TextUtils.isEndOfSentence(text[tokenEnd - 1]):
+                        end = i + 1
+                        break
+
+            chunks.append(
+                {
+                    "inputIds": inputIds[start:end],
+                    "tokenStart": start,
+                    "tokenEnd": end,
+                    "start": offsets[start][0],
+                    "end": offsets[end - 1][1],
+                }
+            )
+
+            if end == nTokens:
+                break
+
+            start, previousEnd = max(end - stride, start + 1), end
 
         return chunks
 
+    @staticmethod
+    def splitText(text: str, maxLength: int) -> List[Tuple[int, int]]:
+        """
+        Split a text into pieces of at most `maxLength` characters. Pieces end on
+        the last paragraph break that fits in them, else on the last end of
+        sentence, else on the last whitespace, and are cut at `maxLength`
+        characters if there is none.
+
+        Parameters
+        ----------
+        `text` : `str`
+            The text to split
+        `maxLength` : `int`
+            The maximum number of characters of a piece
+
+        Returns
+        -------
+        `List[Tuple[int, int]]`
+            The `(start, end)` character span of each piece in the text. The
+            whitespace between two pieces belongs to none of them
+        """
+        assert maxLength > 0, "maxLength must be strictly positive"
+
+        spans: List[Tuple[int, int]] = []
+        start = 0
+
+        while start < len(text):
+            end = min(start + maxLength, len(text))
+
+            if end < len(text):
+                window = text[start : end + 1]
+                for pattern in (r"\n\s*\n", r"[.!?]\s", r"\s"):
+                    cuts = [m.start() for m in re.finditer(pattern, window)]
+                    # A sentence end is kept in its piece
+                    cuts = [c + 1 if pattern == r"[.!?]\s" else c for c in cuts]
+                    cuts = [c for c in cuts if c > 0]
+                    if cuts:
+                        end = start + cuts[-1]
+                        break
+
+            spans.append((start, end))
+
+            # Skip the whitespace between two pieces
+            start = end
+            while start < len(text) and text[start].isspace():
+                start += 1
+
+        return [(start, end) for start, end in spans if end > start]
+
     @staticmethod
     def isInvalidEntity(
         entity: str,
@@ -260,6 +622,43 @@ class TextUtils:
 
         return string
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def getCountriesGazetteer() -> Gazetteer:
+        """
+        Get the gazetteer of countries, compiled on the first call.
+
+        Returns
+        -------
+        `Gazetteer`
+            The gazetteer matching the `COUNTRIES` and their aliases
+        """
+        return Gazetteer(
+            names={
+                country: COUNTRY_ALIASES.get(country, country) for country in COUNTRIES
+            },
+            label=NERConsts.COUNTRY_LABEL,
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def getUNBodiesGazetteer() -> Gazetteer:
+        """
+        Get the gazetteer of UN bodies, compiled on the first call.
+
+        Returns
+        -------
+        `Gazetteer`
+            The gazetteer matching the `UN_BODIES` by acronym or full name
+        """
+        names: Dict[str, str] = {}
+        for acronym, fullName in zip(UN_BODIES[0::2], UN_BODIES[1::2]):
+            canonical = UN_BODY_ALIASES.get(acronym, acronym)
+            names[acronym] = canonical
+            names.setdefault(fullName, canonical)
+
+        return Gazetteer(names=names, label=NERConsts.UN_BODY_LABEL)
+
     @staticmethod
     def extractCountries(text: str) -> List[str]:
         """
@@ -273,17 +672,10 @@ class TextUtils:
         Returns
         -------
         `List[str]`
-            Extracted countries from the text
+            The canonical names of the countries found in the text, sorted
+            alphabetically
         """
-        countries = set()
-        pattern = r"\b(" + "|".join(COUNTRIES) + r")\b"
-
-        results = re.findall(pattern, text)
-        for result in results:
-            result = result[0]
-            countries.add(result)
-
-        return sorted(list(countries))
+        return list(TextUtils.getCountriesGazetteer().count(text=text))
 
     @staticmethod
     def extractUNBodies(text: str) -> List[str]:
@@ -298,14 +690,7 @@ class TextUtils:
         Returns
         -------
         `List[str]`
-            Extracted UN bodies from the text
+            The canonical names of the UN bodies found in the text, sorted
+            alphabetically
         """
-        countries = set()
-        pattern = r"\b(" + "|".join(UN_BODIES) + r")\b"
-
-        results = re.findall(pattern, text)
-        for result in results:
-            result = result[0]
-            countries.add(result)
-
-        return sorted(list(countries))
+        return list(TextUtils.getUNBodiesGazetteer().count(text=text))
@@ -0,0 +1,8 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Named entities with their frequency, countries, UN bodies and detailed entities
+# of a text, as returned by `NamedEntityRecognizer.recognize`
+Recognition = Tuple[Dict[str, int], List[str], List[str], List[Dict[str, Any]]]
+
+# Recognitions of a batch of documents, `None` for the documents without text
+BatchRecognitions = List[Optional[Recognition]]